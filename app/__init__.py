@@ -1,21 +1,22 @@
 import logging
+
+import click
 from flask import Flask
-from flask_cors import CORS
 
 from .config import Config
-from .services.files import ensure_dirs
-from .routes.resume import bp as resume_bp
-from .routes.interview import bp as interview_bp
-from .routes.uploads import bp as uploads_bp
-from .routes.ppt import bp as ppt_bp
-
-# 👇 新增：引入全局 db 实例
-from .extensions import db
 
 
 def create_app() -> Flask:
+    # 蓝图、CORS 及其依赖的服务模块在工厂内部按需导入，
+    # 仅 import app（如单测只挂一个蓝图）时不必加载整套依赖
+    from flask_cors import CORS
+    from .extensions import OrjsonProvider, db, orjson
+    from .services.files import ensure_dirs
+
     app = Flask(__name__)
     app.config.from_object(Config)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
 
     # 👇 新增：初始化 SQLAlchemy（一定要在使用 db 前调用）
     db.init_app(app)
@@ -33,15 +34,22 @@ def create_app() -> Flask:
     ensure_dirs()
 
     # 注册路由 / 蓝图
+    from .routes.resume import bp as resume_bp
     app.register_blueprint(resume_bp)
+    from .routes.interview import bp as interview_bp
     app.register_blueprint(interview_bp)
+    from .routes.uploads import bp as uploads_bp
     app.register_blueprint(uploads_bp)
+    from .routes.ppt import bp as ppt_bp
     app.register_blueprint(ppt_bp)
 
-    # 👇 新增：在应用上下文中创建表（开发环境用这个就够了）
-    with app.app_context():
-        # 确保模型被导入，让 SQLAlchemy 知道这些表
-        from app.models import ResumeUser, ResumeGeneration  # 还有其他模型也可以一起导
+    # 建表不再随 create_app 执行（每个 worker / 测试都会触发一轮元数据查询），
+    # 首次部署时手动执行：flask --app app db-init（已有库的模型变更见 README 中的升级说明）
+    @app.cli.command("db-init")
+    def db_init():
+        """创建所有模型对应的数据表（已存在的表不受影响）"""
+        from . import models  # noqa: F401  确保模型已注册到 metadata
         db.create_all()
+        click.echo("数据表已创建")
 
-    return app
\ No newline at end of file
+    return app
@@ -1,52 +1,93 @@
 # app/config.py
 import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
 
-class Config:
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     """
     全局配置对象：通过 app.config.from_object(Config) 加载。
     仅包含原 test 程序用到的配置项，不引入新功能。
+    环境变量只在模块导入时读取一次，之后实例只读（frozen）。
     """
 
     # ===== 路径与上传目录 =====
-    UPLOAD_ROOT = os.environ.get("UPLOAD_ROOT", "./uploads")
-    RESUME_DIR  = os.path.join(UPLOAD_ROOT, "resumes")
-    JD_DIR      = os.path.join(UPLOAD_ROOT, "job_descriptions")
-    OUTPUT_DIR  = os.path.join(UPLOAD_ROOT, "outputs")
-    INTERVIEW_ROOT = os.path.join(UPLOAD_ROOT, "interview")
-    INTERVIEW_AUDIO_DIR = os.path.join(INTERVIEW_ROOT, "audio")
-    INTERVIEW_REPORT_DIR = os.path.join(INTERVIEW_ROOT, "reports")
+    UPLOAD_ROOT: str = os.environ.get("UPLOAD_ROOT", "./uploads")
+    RESUME_DIR: str = field(init=False)
+    JD_DIR: str = field(init=False)
+    OUTPUT_DIR: str = field(init=False)
+    INTERVIEW_ROOT: str = field(init=False)
+    INTERVIEW_AUDIO_DIR: str = field(init=False)
+    INTERVIEW_REPORT_DIR: str = field(init=False)
+    # 可重建的缓存（LaTeX 格式文件等），删除后会自动重新生成
+    CACHE_DIR: str = field(init=False)
 
     # ===== 日志与请求大小限制 =====
-    LOG_LEVEL  = os.environ.get("LOG_LEVEL", "INFO").upper()
-    MAX_MB     = int(os.environ.get("MAX_UPLOAD_MB", "10"))
+    LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "INFO").upper()
+    MAX_MB: int = int(os.environ.get("MAX_UPLOAD_MB", "10"))
     # Flask 识别的内容长度限制（单位：字节）
-    MAX_CONTENT_LENGTH = MAX_MB * 1024 * 1024
+    MAX_CONTENT_LENGTH: int = field(init=False)
+    # 下载文件交给前置 Web 服务器（Apache mod_xsendfile / lighttpd 等识别 X-Sendfile 头）发送，
+    # Flask 的 send_file 会读取该配置；未部署此类服务器时保持关闭
+    USE_X_SENDFILE: bool = os.environ.get("USE_X_SENDFILE", "").lower() in ("1", "true", "yes")
 
     # ===== 数据库配置（新增） =====
     # 优先使用环境变量，如果没有则使用SQLite（开发环境）
-    DATABASE_URL = os.environ.get("DATABASE_URL")
-    if DATABASE_URL:
-        SQLALCHEMY_DATABASE_URI = DATABASE_URL
-    else:
-        # 使用SQLite作为默认数据库（不需要额外配置）
-        SQLALCHEMY_DATABASE_URI = "sqlite:///smart_job_assistant.db"
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_URL: Optional[str] = os.environ.get("DATABASE_URL")
+    SQLALCHEMY_DATABASE_URI: str = field(init=False)
+    SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
+    # 连接池参数：pool_size 建议与 Gunicorn workers × threads 对齐，
+    # MySQL 端 max_connections 需 ≥ workers × (pool_size + max_overflow)
+    DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", "25"))
+    DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", "25"))
+    DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    SQLALCHEMY_ENGINE_OPTIONS: Dict[str, Any] = field(init=False)
 
     # ===== CORS 白名单（与原 app.py 保持一致）=====
-    CORS_ORIGINS = [
+    CORS_ORIGINS: List[str] = field(default_factory=lambda: [
         "http://localhost:5173",
         "http://127.0.0.1:5173",
-    ]
+    ])
 
     # ===== 模型与推理参数（与原 app.py 完全一致）=====
-    OLLAMA_MODEL    = os.environ.get("OLLAMA_MODEL", "qwen:7b")
-    GEN_TEMPERATURE = float(os.environ.get("GEN_TEMPERATURE", "0.2"))
-    MAX_INPUT_CHARS = int(os.environ.get("MAX_INPUT_CHARS", "24000"))
+    OLLAMA_MODEL: str = os.environ.get("OLLAMA_MODEL", "qwen:7b")
+    GEN_TEMPERATURE: float = float(os.environ.get("GEN_TEMPERATURE", "0.2"))
+    MAX_INPUT_CHARS: int = int(os.environ.get("MAX_INPUT_CHARS", "24000"))
 
     # ===== 允许的扩展名（与原 app.py 完全一致）=====
-    ALLOWED_EXTS = {".pdf", ".docx", ".txt"}
+    ALLOWED_EXTS: FrozenSet[str] = frozenset({".pdf", ".docx", ".txt"})
 
     # ===== 讯飞实时转写配置 =====
     # 必须通过环境变量设置，不允许硬编码
-    XFYUN_APPID = os.environ.get("XFYUN_APPID", "")
-    XFYUN_API_KEY = os.environ.get("XFYUN_API_KEY", "")
\ No newline at end of file
+    XFYUN_APPID: str = os.environ.get("XFYUN_APPID", "")
+    XFYUN_API_KEY: str = os.environ.get("XFYUN_API_KEY", "")
+
+    def __post_init__(self):
+        # frozen dataclass 只能通过 object.__setattr__ 填充派生字段
+        set_ = object.__setattr__
+        set_(self, "RESUME_DIR", os.path.join(self.UPLOAD_ROOT, "resumes"))
+        set_(self, "JD_DIR", os.path.join(self.UPLOAD_ROOT, "job_descriptions"))
+        set_(self, "OUTPUT_DIR", os.path.join(self.UPLOAD_ROOT, "outputs"))
+        set_(self, "INTERVIEW_ROOT", os.path.join(self.UPLOAD_ROOT, "interview"))
+        set_(self, "INTERVIEW_AUDIO_DIR", os.path.join(self.INTERVIEW_ROOT, "audio"))
+        set_(self, "INTERVIEW_REPORT_DIR", os.path.join(self.INTERVIEW_ROOT, "reports"))
+        set_(self, "CACHE_DIR", os.path.join(self.UPLOAD_ROOT, "cache"))
+        set_(self, "MAX_CONTENT_LENGTH", self.MAX_MB * 1024 * 1024)
+        # 使用SQLite作为默认数据库（不需要额外配置）
+        set_(self, "SQLALCHEMY_DATABASE_URI", self.DATABASE_URL or "sqlite:///smart_job_assistant.db")
+        # 仅外部数据库（MySQL 等）启用连接池参数，SQLite（含内存库）保持驱动默认
+        if not self.SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+            engine_options = {
+                "pool_size": self.DB_POOL_SIZE,
+                "max_overflow": self.DB_MAX_OVERFLOW,
+                "pool_pre_ping": True,
+                "pool_recycle": self.DB_POOL_RECYCLE,
+            }
+        else:
+            engine_options = {}
+        set_(self, "SQLALCHEMY_ENGINE_OPTIONS", engine_options)
+
+
+# 进程内唯一的配置实例，各模块通过 `from app.config import Config` 使用
+Config = Settings()
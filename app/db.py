@@ -1,15 +1,63 @@
-from typing import Optional, List
-from . import db
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import insert
+
+from .extensions import db
 from .models import FileRecord, GenerationRecord
 
+
+@contextmanager
+def batch_records() -> Iterator[Any]:
+    """
+    批量写入记录：块内的所有 create_* 调用共享一次 commit，异常时整体回滚。
+
+        with batch_records():
+            create_file_record(...)
+            create_generation_record(...)
+    """
+    try:
+        yield db.session
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
 def create_file_record(kind: str, filename: str, path: str, size: int) -> FileRecord:
+    """添加一条文件记录（不 commit，需在 batch_records() 内调用）"""
     rec = FileRecord(kind=kind, filename=filename, path=path, size=size)
     db.session.add(rec)
-    db.session.commit()
     return rec
 
+
 def create_generation_record(file_id: str, kind: str, md_path: str, pdf_path: str, warnings: str = "") -> GenerationRecord:
+    """添加一条生成记录（不 commit，需在 batch_records() 内调用）"""
     rec = GenerationRecord(file_id=file_id, kind=kind, md_path=md_path, pdf_path=pdf_path, warnings=warnings)
     db.session.add(rec)
-    db.session.commit()
+    return rec
+
+
+def bulk_create_file_records(rows: List[Dict[str, Any]]) -> None:
+    """多条文件记录一次性 INSERT，跳过逐个 ORM 对象的开销（同样不 commit）"""
+    if rows:
+        db.session.execute(insert(FileRecord), rows)
+
+
+def bulk_create_generation_records(rows: List[Dict[str, Any]]) -> None:
+    """多条生成记录一次性 INSERT（同样不 commit）"""
+    if rows:
+        db.session.execute(insert(GenerationRecord), rows)
+
+
+# ===== 兼容旧接口：单条写入并立即 commit =====
+def save_file_record(kind: str, filename: str, path: str, size: int) -> FileRecord:
+    with batch_records():
+        rec = create_file_record(kind, filename, path, size)
+    return rec
+
+
+def save_generation_record(file_id: str, kind: str, md_path: str, pdf_path: str, warnings: str = "") -> GenerationRecord:
+    with batch_records():
+        rec = create_generation_record(file_id, kind, md_path, pdf_path, warnings)
     return rec
@@ -1,5 +1,25 @@
 # app/extensions.py
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 
+try:  # 可选依赖：未安装 orjson 时保留 Flask 默认的 json 实现
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 # 全局共享的 db 实例
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """用 orjson 序列化 jsonify 响应（报告 / markdown 等大 payload 明显更快）"""
+
+    if orjson is not None:
+        _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs) -> str:
+        # orjson 不支持 indent/sort_keys 等 json 参数，统一忽略
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
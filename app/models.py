@@ -1,6 +1,9 @@
 # app/models.py
 from datetime import datetime
-from app.extensions import db
+
+from sqlalchemy.dialects import mysql
+
+from .extensions import db
 
 
 class Resume(db.Model):
@@ -19,18 +22,23 @@ class Resume(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    educations = db.relationship("Education", backref="resume", cascade="all, delete-orphan")
-    internships = db.relationship("Internship", backref="resume", cascade="all, delete-orphan")
-    work_experiences = db.relationship("WorkExperience", backref="resume", cascade="all, delete-orphan")
-    projects = db.relationship("Project", backref="resume", cascade="all, delete-orphan")
-    competitions = db.relationship("Competition", backref="resume", cascade="all, delete-orphan")
+    # 子表统一 selectin 加载：Resume.query.all() 固定 1 + 5 条 SELECT，与简历数量无关
+    educations = db.relationship("Education", back_populates="resume", cascade="all, delete-orphan", lazy="selectin")
+    internships = db.relationship("Internship", back_populates="resume", cascade="all, delete-orphan", lazy="selectin")
+    work_experiences = db.relationship("WorkExperience", back_populates="resume", cascade="all, delete-orphan", lazy="selectin")
+    projects = db.relationship("Project", back_populates="resume", cascade="all, delete-orphan", lazy="selectin")
+    competitions = db.relationship("Competition", back_populates="resume", cascade="all, delete-orphan", lazy="selectin")
 
 
 class Education(db.Model):
     __tablename__ = "educations"
 
     id = db.Column(db.Integer, primary_key=True)
-    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("resume_users.id"), nullable=True, index=True)
+    # 反向关系保持默认 lazy="select"：多对一按主键取，命中 identity map 时不发 SQL
+    resume = db.relationship("Resume", back_populates="educations")
+    user = db.relationship("ResumeUser", back_populates="educations")
 
     degree = db.Column(db.String(128))
     school = db.Column(db.String(256))
@@ -44,7 +52,10 @@ class Internship(db.Model):
     __tablename__ = "internships"
 
     id = db.Column(db.Integer, primary_key=True)
-    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("resume_users.id"), nullable=True, index=True)
+    resume = db.relationship("Resume", back_populates="internships")
+    user = db.relationship("ResumeUser", back_populates="internships")
 
     company = db.Column(db.String(256))
     title = db.Column(db.String(128))
@@ -56,7 +67,10 @@ class WorkExperience(db.Model):
     __tablename__ = "work_experiences"
 
     id = db.Column(db.Integer, primary_key=True)
-    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("resume_users.id"), nullable=True, index=True)
+    resume = db.relationship("Resume", back_populates="work_experiences")
+    user = db.relationship("ResumeUser", back_populates="work_experiences")
 
     company = db.Column(db.String(256))
     title = db.Column(db.String(128))
@@ -69,7 +83,10 @@ class Project(db.Model):
     __tablename__ = "projects"
 
     id = db.Column(db.Integer, primary_key=True)
-    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("resume_users.id"), nullable=True, index=True)
+    resume = db.relationship("Resume", back_populates="projects")
+    user = db.relationship("ResumeUser", back_populates="projects")
 
     name = db.Column(db.String(256))
     timeframe = db.Column(db.String(64))
@@ -80,17 +97,21 @@ class Competition(db.Model):
     __tablename__ = "competitions"
 
     id = db.Column(db.Integer, primary_key=True)
-    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resumes.id"), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("resume_users.id"), nullable=True, index=True)
+    resume = db.relationship("Resume", back_populates="competitions")
+    user = db.relationship("ResumeUser", back_populates="competitions")
 
     name = db.Column(db.String(256))
     level = db.Column(db.String(64))
     result = db.Column(db.String(128))
+    year = db.Column(db.String(16))
 
 class ResumeUser(db.Model):
     __tablename__ = "resume_users"
 
-    # 对应：id BIGINT PRIMARY KEY AUTO_INCREMENT
-    id = db.Column(db.BigInteger, primary_key=True)
+    # 对应：id INT PRIMARY KEY AUTO_INCREMENT（4 字节主键，索引更窄）
+    id = db.Column(db.Integer, primary_key=True)
 
     # ===== Personal Information =====
     full_name = db.Column(db.String(128), nullable=False)
@@ -100,94 +121,20 @@ class ResumeUser(db.Model):
     github = db.Column(db.String(255), nullable=True)
     linkedin = db.Column(db.String(255), nullable=True)
 
-    # ===== Education (Up to 3) =====
-    edu1_degree = db.Column(db.String(255), nullable=True)
-    edu1_school = db.Column(db.String(255), nullable=True)
-    edu1_start = db.Column(db.String(32), nullable=True)
-    edu1_end = db.Column(db.String(32), nullable=True)
-    edu1_major = db.Column(db.String(255), nullable=True)
-    edu1_gpa = db.Column(db.String(64), nullable=True)
-
-    edu2_degree = db.Column(db.String(255), nullable=True)
-    edu2_school = db.Column(db.String(255), nullable=True)
-    edu2_start = db.Column(db.String(32), nullable=True)
-    edu2_end = db.Column(db.String(32), nullable=True)
-    edu2_major = db.Column(db.String(255), nullable=True)
-    edu2_gpa = db.Column(db.String(64), nullable=True)
-
-    edu3_degree = db.Column(db.String(255), nullable=True)
-    edu3_school = db.Column(db.String(255), nullable=True)
-    edu3_start = db.Column(db.String(32), nullable=True)
-    edu3_end = db.Column(db.String(32), nullable=True)
-    edu3_major = db.Column(db.String(255), nullable=True)
-    edu3_gpa = db.Column(db.String(64), nullable=True)
-
-    # ===== Internships (Up to 3) =====
-    int1_company = db.Column(db.String(255), nullable=True)
-    int1_title = db.Column(db.String(255), nullable=True)
-    int1_period = db.Column(db.String(64), nullable=True)
-    int1_responsibility = db.Column(db.Text, nullable=True)
-
-    int2_company = db.Column(db.String(255), nullable=True)
-    int2_title = db.Column(db.String(255), nullable=True)
-    int2_period = db.Column(db.String(64), nullable=True)
-    int2_responsibility = db.Column(db.Text, nullable=True)
-
-    int3_company = db.Column(db.String(255), nullable=True)
-    int3_title = db.Column(db.String(255), nullable=True)
-    int3_period = db.Column(db.String(64), nullable=True)
-    int3_responsibility = db.Column(db.Text, nullable=True)
-
-    # ===== Work Experience (Up to 3) =====
-    work1_company = db.Column(db.String(255), nullable=True)
-    work1_title = db.Column(db.String(255), nullable=True)
-    work1_period = db.Column(db.String(64), nullable=True)
-    work1_responsibility = db.Column(db.Text, nullable=True)
-    work1_reason_leave = db.Column(db.String(255), nullable=True)
-
-    work2_company = db.Column(db.String(255), nullable=True)
-    work2_title = db.Column(db.String(255), nullable=True)
-    work2_period = db.Column(db.String(64), nullable=True)
-    work2_responsibility = db.Column(db.Text, nullable=True)
-    work2_reason_leave = db.Column(db.String(255), nullable=True)
-
-    work3_company = db.Column(db.String(255), nullable=True)
-    work3_title = db.Column(db.String(255), nullable=True)
-    work3_period = db.Column(db.String(64), nullable=True)
-    work3_responsibility = db.Column(db.Text, nullable=True)
-    work3_reason_leave = db.Column(db.String(255), nullable=True)
-
-    # ===== Projects (Up to 3) =====
-    proj1_name = db.Column(db.String(255), nullable=True)
-    proj1_period = db.Column(db.String(64), nullable=True)
-    proj1_details = db.Column(db.Text, nullable=True)
-
-    proj2_name = db.Column(db.String(255), nullable=True)
-    proj2_period = db.Column(db.String(64), nullable=True)
-    proj2_details = db.Column(db.Text, nullable=True)
-
-    proj3_name = db.Column(db.String(255), nullable=True)
-    proj3_period = db.Column(db.String(64), nullable=True)
-    proj3_details = db.Column(db.Text, nullable=True)
+    # ===== Education / Internships / Work / Projects / Competitions =====
+    # 不再用 edu1_*/int1_* … 平铺 3 组列，每段经历是子表中的一行（子表通过 user_id 关联，
+    # resume_id 留给 Resume 使用）。列表页只读本表的窄列，详情页再 selectinload 子表。
+    educations = db.relationship("Education", back_populates="user", cascade="all, delete-orphan")
+    internships = db.relationship("Internship", back_populates="user", cascade="all, delete-orphan")
+    work_experiences = db.relationship("WorkExperience", back_populates="user", cascade="all, delete-orphan")
+    projects = db.relationship("Project", back_populates="user", cascade="all, delete-orphan")
+    competitions = db.relationship("Competition", back_populates="user", cascade="all, delete-orphan")
 
     # ===== Skills =====
     programming_skills = db.Column(db.Text, nullable=True)
     office_skills = db.Column(db.Text, nullable=True)
     languages = db.Column(db.Text, nullable=True)
 
-    # ===== Competitions (Up to 3) =====
-    comp1_name = db.Column(db.String(255), nullable=True)
-    comp1_award = db.Column(db.String(255), nullable=True)
-    comp1_year = db.Column(db.String(16), nullable=True)
-
-    comp2_name = db.Column(db.String(255), nullable=True)
-    comp2_award = db.Column(db.String(255), nullable=True)
-    comp2_year = db.Column(db.String(16), nullable=True)
-
-    comp3_name = db.Column(db.String(255), nullable=True)
-    comp3_award = db.Column(db.String(255), nullable=True)
-    comp3_year = db.Column(db.String(16), nullable=True)
-
     # ===== Others =====
     others = db.Column(db.Text, nullable=True)
 
@@ -195,26 +142,33 @@ class ResumeUser(db.Model):
     resume_raw = db.Column(db.Text, nullable=True)
 
     # ===== Timestamps =====
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # TIMESTAMP（MySQL 4 字节）由数据库填充，更新时刷新 updated_at
+    created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), nullable=False)
     updated_at = db.Column(
-        db.DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        db.TIMESTAMP,
+        server_default=db.func.current_timestamp(),
+        onupdate=db.func.current_timestamp(),
         nullable=False,
     )
 
-    # 关联到多次生成记录
-    generations = db.relationship("ResumeGeneration", backref="user", lazy=True)
+    # 关联到多次生成记录（selectin：列出多个用户时只额外发一条 IN 查询，避免 N+1）
+    generations = db.relationship("ResumeGeneration", back_populates="user", lazy="selectin")
 
 
 class ResumeGeneration(db.Model):
     __tablename__ = "resume_generations"
+    # 按用户列出生成历史（WHERE user_id = ? ORDER BY created_at）走联合索引
+    __table_args__ = (
+        db.Index("ix_resume_generations_user_id_created", "user_id", "created_at"),
+    )
+
+    # 对应：id INT AUTO_INCREMENT
+    id = db.Column(db.Integer, primary_key=True)
 
-    # 对应：id BIGINT / INT UNSIGNED AUTO_INCREMENT
-    id = db.Column(db.BigInteger, primary_key=True)
+    # 外键：指向 resume_users.id（与主键同为 INT）
+    user_id = db.Column(db.Integer, db.ForeignKey("resume_users.id"), nullable=False)
 
-    # 外键：指向 resume_users.id（你的表里是 BIGINT，我们也用 BigInteger）
-    user_id = db.Column(db.BigInteger, db.ForeignKey("resume_users.id"), nullable=False)
+    user = db.relationship("ResumeUser", back_populates="generations")
 
     # 本次上传/生成的唯一 ID（例如 resume-abcd12）
     file_id = db.Column(db.String(64), unique=True, nullable=False)
@@ -241,12 +195,50 @@ class ResumeGeneration(db.Model):
 
     # 可选字段
     prompt_used = db.Column(db.Text, nullable=True)
-    snapshot_profile = db.Column(db.JSON, nullable=True)
+    # MySQL 上使用原生 JSON 列（服务端校验/解析），其他数据库仍为通用 JSON
+    snapshot_profile = db.Column(db.JSON().with_variant(mysql.JSON(), "mysql"), nullable=True)
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # TIMESTAMP（MySQL 4 字节）由数据库填充，更新时刷新 updated_at
+    created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), nullable=False)
     updated_at = db.Column(
-        db.DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        db.TIMESTAMP,
+        server_default=db.func.current_timestamp(),
+        onupdate=db.func.current_timestamp(),
         nullable=False,
-    )
\ No newline at end of file
+    )
+
+
+class FileRecord(db.Model):
+    __tablename__ = "files"
+    __table_args__ = (
+        db.Index("ix_files_kind_created", "kind", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # 文件类别（resume / jd / output 等）
+    kind = db.Column(db.String(32), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    path = db.Column(db.String(512), nullable=False)
+    size = db.Column(db.Integer, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class GenerationRecord(db.Model):
+    __tablename__ = "generations"
+    # 按类型列出最近的生成记录
+    __table_args__ = (
+        db.Index("ix_generations_kind_created", "kind", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # 对应生成接口返回的 fileId
+    file_id = db.Column(db.String(64), index=True, nullable=False)
+    kind = db.Column(db.String(32), nullable=False)
+    md_path = db.Column(db.String(512), nullable=True)
+    pdf_path = db.Column(db.String(512), nullable=True)
+    warnings = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
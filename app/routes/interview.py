@@ -1,28 +1,33 @@
 # app/routes/interview.py
 import logging
-from typing import Optional
+from operator import attrgetter
+from typing import TYPE_CHECKING, Optional
 
 from flask import Blueprint, jsonify, request, url_for
 
 from ..config import Config
 from ..services.files import (
-    ensure_dirs,
     ext_ok,
-    read_text_from_file,
-    save_file,
+    read_and_save,
     truncate_text,
 )
-from ..services.interview_service import (
-    AnswerRecord,
-    build_report,
-    create_session,
-    get_session,
-    submit_answer,
-)
+
+# interview_service 依赖讯飞 websocket、OpenAI 客户端等重量级模块，
+# 在视图函数内首次使用时才导入，避免拖慢 worker 启动；此处只为类型标注
+if TYPE_CHECKING:
+    from ..services.interview_service import AnswerRecord
 
 bp = Blueprint("interview", __name__)
 logger = logging.getLogger(__name__)
 
+# 配置在导入时已固定，模块级缓存一次即可
+_MAX_INPUT_CHARS = Config.MAX_INPUT_CHARS
+_MAX_CONTENT_LENGTH = Config.MAX_CONTENT_LENGTH
+
+# 问题序列化：一次 attrgetter 取出三个字段，再与 JSON 键名 zip 成 dict
+_QUESTION_FIELDS = attrgetter("id", "text", "duration_seconds")
+_QUESTION_KEYS = ("id", "text", "durationSeconds")
+
 
 def _extract_job_description() -> tuple[Optional[str], list[str]]:
     """
@@ -34,10 +39,9 @@ def _extract_job_description() -> tuple[Optional[str], list[str]]:
     if not ext_ok(jd_file.filename):
         raise ValueError("Unsupported job description file type")
 
-    ensure_dirs()
-    jd_path = save_file(jd_file, Config.JD_DIR)  # type: ignore[name-defined]
-    text, warn = read_text_from_file(jd_path)
-    text, wcut = truncate_text(text, Config.MAX_INPUT_CHARS)
+    # 上传目录已在 create_app() 启动时创建，这里不再逐请求 mkdir
+    _, text, warn = read_and_save(jd_file, Config.JD_DIR)
+    text, wcut = truncate_text(text, _MAX_INPUT_CHARS)
     warnings = [w for w in (warn, wcut) if w]
     return text, warnings
 
@@ -59,6 +63,8 @@ def api_interview_questions():
         logger.exception("处理 JD 文件失败")
         return jsonify({"success": False, "message": f"解析职位描述失败: {exc}"}), 500
 
+    from ..services.interview_service import create_session
+
     session = create_session(job_text)
     
     # 添加问题生成的警告信息
@@ -67,11 +73,7 @@ def api_interview_questions():
         warnings.extend(question_warnings)
     
     questions_payload = [
-        {
-            "id": question.id,
-            "text": question.text,
-            "durationSeconds": question.duration_seconds,
-        }
+        dict(zip(_QUESTION_KEYS, _QUESTION_FIELDS(question)))
         for question in session.questions
     ]
 
@@ -88,8 +90,14 @@ def api_interview_questions():
 
 @bp.post("/api/interview/answer")
 def api_interview_answer():
-    session_id = request.form.get("sessionId")
-    question_id = request.form.get("questionId")
+    # 按请求头的 Content-Length 提前拒绝超大音频，不解析表单、不落盘
+    content_length = request.content_length
+    if content_length and content_length > _MAX_CONTENT_LENGTH:
+        return jsonify({"success": False, "message": f"Request body exceeds {Config.MAX_MB}MB."}), 413
+
+    form = request.form
+    session_id = form.get("sessionId")
+    question_id = form.get("questionId")
     if not session_id or not question_id:
         return jsonify({"success": False, "message": "Missing sessionId or questionId"}), 400
 
@@ -97,7 +105,7 @@ def api_interview_answer():
     if not audio_file:
         return jsonify({"success": False, "message": "Audio file is required."}), 400
 
-    elapsed_raw = request.form.get("elapsedSeconds")
+    elapsed_raw = form.get("elapsedSeconds")
     elapsed_seconds: Optional[float] = None
     if elapsed_raw:
         try:
@@ -105,6 +113,8 @@ def api_interview_answer():
         except ValueError:
             return jsonify({"success": False, "message": "Invalid elapsedSeconds value."}), 400
 
+    from ..services.interview_service import submit_answer
+
     try:
         record, next_question_id, next_question_text, warnings = submit_answer(
             session_id=session_id,
@@ -125,7 +135,7 @@ def api_interview_answer():
 
 
 def _serialize_answer(
-    record: AnswerRecord,
+    record: "AnswerRecord",
     warnings: list[str],
     next_question_id: Optional[str],
     next_question_text: Optional[str],
@@ -145,6 +155,8 @@ def _serialize_answer(
 
 @bp.get("/api/interview/report/<session_id>")
 def api_interview_report(session_id: str):
+    from ..services.interview_service import build_report
+
     try:
         report, markdown = build_report(session_id)
     except KeyError as exc:
@@ -166,6 +178,8 @@ def api_interview_report(session_id: str):
 
 @bp.get("/api/interview/session/<session_id>")
 def api_interview_session(session_id: str):
+    from ..services.interview_service import get_session
+
     try:
         session = get_session(session_id)
     except KeyError as exc:
@@ -5,16 +5,31 @@ from flask import Blueprint, request, jsonify, send_file
 from werkzeug.utils import secure_filename
 
 from app.config import Config
-from app.services.files import ext_ok, save_file, read_text_from_file, truncate_text
+from app.services import file_registry
+from app.services.files import (
+    UploadTooLarge, discard_async_upload, ext_ok, read_and_save, read_and_save_async, truncate_text,
+)
 from app.services.ppt_service import generate_self_intro_ppt
 
 bp = Blueprint("ppt", __name__)
 logger = logging.getLogger(__name__)
 
+# 配置在导入时已固定，模块级缓存一次即可
+_MAX_INPUT_CHARS = Config.MAX_INPUT_CHARS
+_MAX_CONTENT_LENGTH = Config.MAX_CONTENT_LENGTH
+
 
 @bp.post("/api/ppt/generate")
 def generate_ppt():
     """生成自我介绍PPT"""
+    # 按请求头的 Content-Length 提前拒绝超大请求，不解析表单、不落盘
+    content_length = request.content_length
+    if content_length and content_length > _MAX_CONTENT_LENGTH:
+        return jsonify({
+            "success": False,
+            "message": f"上传文件过大，请求体不能超过 {Config.MAX_MB}MB"
+        }), 413
+
     try:
         # 检查文件上传
         if 'resume' not in request.files:
@@ -33,29 +48,48 @@ def generate_ppt():
         jd_file = request.files['jobDescription']
         
         # 验证文件
-        if resume_file.filename == '' or not ext_ok(resume_file.filename):
+        if not resume_file.filename:
+            return jsonify({
+                "success": False,
+                "message": "请选择简历文件"
+            }), 400
+        if not ext_ok(resume_file.filename):
             return jsonify({
                 "success": False,
                 "message": "简历文件格式不支持，请上传PDF、Word或TXT文件"
             }), 400
         
-        if jd_file.filename == '' or not ext_ok(jd_file.filename):
+        if not jd_file.filename:
+            return jsonify({
+                "success": False,
+                "message": "请选择岗位JD文件"
+            }), 400
+        if not ext_ok(jd_file.filename):
             return jsonify({
                 "success": False,
                 "message": "岗位JD文件格式不支持，请上传PDF、Word或TXT文件"
             }), 400
         
-        # 保存文件
-        resume_path = save_file(resume_file, Config.RESUME_DIR)
-        jd_path = save_file(jd_file, Config.JD_DIR)
+        # 保存并读取文件内容：简历在线程池中处理，JD 在当前线程处理，两者并行
+        try:
+            resume_future = read_and_save_async(resume_file, Config.RESUME_DIR)
+            try:
+                jd_path, jd_text, jd_warn = read_and_save(jd_file, Config.JD_DIR)
+            except Exception:
+                # 返回前先收尾简历读取（请求结束后上传流会被关闭），并删除已落盘的简历
+                discard_async_upload(resume_future)
+                raise
+            resume_path, resume_text, resume_warn = resume_future.result()
+        except UploadTooLarge as e:
+            # 单个文件超过大小上限
+            return jsonify({
+                "success": False,
+                "message": str(e)
+            }), 413
         
         logger.info(f"简历文件已保存: {resume_path}")
         logger.info(f"JD文件已保存: {jd_path}")
         
-        # 读取文件内容
-        resume_text, resume_warn = read_text_from_file(resume_path)
-        jd_text, jd_warn = read_text_from_file(jd_path)
-        
         warnings = []
         if resume_warn:
             warnings.append(f"简历文件: {resume_warn}")
@@ -75,8 +109,8 @@ def generate_ppt():
             }), 400
         
         # 截断文本（如果需要）
-        resume_text, resume_trunc_warn = truncate_text(resume_text, Config.MAX_INPUT_CHARS)
-        jd_text, jd_trunc_warn = truncate_text(jd_text, Config.MAX_INPUT_CHARS)
+        resume_text, resume_trunc_warn = truncate_text(resume_text, _MAX_INPUT_CHARS)
+        jd_text, jd_trunc_warn = truncate_text(jd_text, _MAX_INPUT_CHARS)
         
         if resume_trunc_warn:
             warnings.append(f"简历: {resume_trunc_warn}")
@@ -97,8 +131,9 @@ def generate_ppt():
                 "message": f"生成PPT失败: {error}"
             }), 500
         
-        # 获取文件名
+        # 获取文件名，并登记供下载接口直接查表
         ppt_filename = os.path.basename(ppt_path)
+        file_registry.register(ppt_path)
         
         logger.info(f"PPT生成成功: {ppt_path}")
         
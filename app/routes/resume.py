@@ -1,62 +1,100 @@
 # app/routes/resume.py
 import os
 import re
+import hashlib
+import threading
 import uuid
 import shutil
 import logging
 import tempfile
 import subprocess
-import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, Tuple
+from typing import Any, Dict, Iterator, Optional, Tuple
 
-from flask import Blueprint, request, jsonify, url_for
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
 from openai import OpenAI
 
 from app.config import Config
 from app.services.files import (
-    ensure_dirs, ext_ok, save_file,
-    read_text_from_file, truncate_text,
+    UploadTooLarge, discard_async_upload, ensure_dirs, ext_ok,
+    read_and_save, read_and_save_async, truncate_text,
 )
+from app.services import file_registry, llm_cache
+from app.services.latex_utils import markdown_to_latex, wrap_into_template
 from app.services.prompts import build_resume_prompt
 
 bp = Blueprint("resume", __name__)
 logger = logging.getLogger(__name__)
 
+# 配置在导入时已固定，模块级缓存一次即可
+_MAX_INPUT_CHARS = Config.MAX_INPUT_CHARS
+# 简历生成的采样温度（也参与缓存键）
+_TEMPERATURE = 0.3
+
+# 生成结果落盘用的 I/O 线程池：写文件与 LaTeX 编译重叠，不占请求线程等待磁盘
+_io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="resume-io")
+
 # 初始化qwen
 # 优先使用 DASHSCOPE_API_KEY（百炼API Key），从环境变量读取，不允许硬编码
 QWEN_BASE_URL = os.getenv("QWEN_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1")
 
+# (api_key, base_url, client)：环境变量不变时复用同一个客户端及其 HTTP 连接池
+_qwen_client_cache: Optional[Tuple[str, str, OpenAI]] = None
+_qwen_client_lock = threading.Lock()
+
+
 def get_qwen_client():
     """
     延迟初始化 OpenAI 客户端，每次调用时重新读取环境变量
-    这样可以确保在 .env.local 加载后也能正确获取 API key
+    这样可以确保在 .env.local 加载后也能正确获取 API key；
+    key / base_url 未变化时返回缓存的客户端，保持与 DashScope 的长连接（免去重复 TLS 握手）
     """
+    global _qwen_client_cache
     api_key = os.getenv("DASHSCOPE_API_KEY") or os.getenv("QWEN_API_KEY", "")
-    if not api_key:
-        logger.warning("DASHSCOPE_API_KEY 或 QWEN_API_KEY 未设置，简历生成功能将无法正常工作。请设置环境变量 DASHSCOPE_API_KEY 或 QWEN_API_KEY")
-    else:
-        logger.info(f"API Key 已配置（长度: {len(api_key)}）")
-    return OpenAI(
-        api_key=api_key,
-        base_url=QWEN_BASE_URL,
-    )
+    cached = _qwen_client_cache
+    if cached is not None and cached[0] == api_key and cached[1] == QWEN_BASE_URL:
+        return cached[2]
+
+    with _qwen_client_lock:
+        cached = _qwen_client_cache
+        if cached is not None and cached[0] == api_key and cached[1] == QWEN_BASE_URL:
+            return cached[2]
+        if not api_key:
+            logger.warning("DASHSCOPE_API_KEY 或 QWEN_API_KEY 未设置，简历生成功能将无法正常工作。请设置环境变量 DASHSCOPE_API_KEY 或 QWEN_API_KEY")
+        else:
+            logger.info(f"API Key 已配置（长度: {len(api_key)}）")
+        client = OpenAI(
+            api_key=api_key,
+            base_url=QWEN_BASE_URL,
+        )
+        _qwen_client_cache = (api_key, QWEN_BASE_URL, client)
+        return client
+
 
-# Markdown -> LaTeX
+# 模型输出外层的 ``` 包裹
 TRIPLE_BACKTICK_RE = re.compile(r"^\s*```(?:[a-zA-Z]+)?\s*([\s\S]*?)\s*```\s*$")
 
+# detect_language 用：连续的中文 / ASCII 字母片段
+_RE_ZH_RUN = re.compile(r'[\u4e00-\u9fff]+')
+_RE_ALPHA_RUN = re.compile(r'[a-zA-Z]+')
+
 
 def detect_language(text: str) -> str:
     """
     检测文本的主要语言（中文或英文）
     返回 'zh' 或 'en'
     """
-    if not text:
+    # 纯 ASCII 文本（str.isascii 在 C 层直接读字符串的 ASCII 标志）不可能含中文
+    if not text or text.isascii():
         return 'en'  # 默认英文
 
-    # 统计中文字符数量
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-    total_chars = len(re.findall(r'[a-zA-Z\u4e00-\u9fff]', text))
+    # 按连续片段匹配再累加长度：匹配对象数量是“词”级而非逐字符
+    chinese_chars = sum(map(len, _RE_ZH_RUN.findall(text)))
+    if not chinese_chars:
+        return 'en'
+    total_chars = chinese_chars + sum(map(len, _RE_ALPHA_RUN.findall(text)))
 
     if total_chars == 0:
         return 'en'
@@ -67,20 +105,6 @@ def detect_language(text: str) -> str:
     return 'en'
 
 
-LATEX_SPECIAL = {
-    '\\': r'\textbackslash{}',
-    '{': r'\{',
-    '}': r'\}',
-    '#': r'\#',
-    '$': r'\$',
-    '%': r'\%',
-    '&': r'\&',
-    '_': r'\_',
-    '^': r'\^{}',
-    '~': r'\~{}',
-}
-
-
 def strip_code_fences(text: str) -> str:
     """去掉最外层 ``` 包裹（若存在），返回内部内容。"""
     m = TRIPLE_BACKTICK_RE.match(text.strip())
@@ -89,6 +113,15 @@ def strip_code_fences(text: str) -> str:
     return text.strip()
 
 
+def _format_manual_entry(item: Any) -> Optional[str]:
+    """manualResume 中的一条经历 -> "- 值1; 值2"（只取非空字符串字段）；无内容返回 None"""
+    if not isinstance(item, dict):
+        return None
+    stripped = (v.strip() for v in item.values() if isinstance(v, str))
+    values = [v for v in stripped if v]
+    return f"- {'; '.join(values)}" if values else None
+
+
 def manual_resume_to_text(payload: Dict[str, Any]) -> str:
     """
     把前端传来的 manualResume JSON（ManualResumeFormData）转成一段纯文本，
@@ -111,15 +144,10 @@ def manual_resume_to_text(payload: Dict[str, Any]) -> str:
         lines.append(f"Personal Information: {personal_text}")
 
     def join_section(title: str, entries):
-        section_lines = []
-        for item in entries or []:
-            if not isinstance(item, dict):
-                continue
-            values = [str(v).strip() for v in item.values() if isinstance(v, str) and v.strip()]
-            if values:
-                section_lines.append(f"- {'; '.join(values)}")
-        if section_lines:
-            lines.append(f"{title}:\n" + "\n".join(section_lines))
+        # 每条经历格式化为一行，空条目在 filter 中丢弃，整段一次 join
+        body = "\n".join(filter(None, map(_format_manual_entry, entries or ())))
+        if body:
+            lines.append(f"{title}:\n{body}")
 
     join_section("Education", payload.get("education"))
     join_section("Internships", payload.get("internships"))
@@ -134,418 +162,269 @@ def manual_resume_to_text(payload: Dict[str, Any]) -> str:
 
     join_section("Competitions", payload.get("competitions"))
 
-    return "\n".join(line for line in lines if line).strip()
-
+    # 只有非空内容才会被追加，无需再逐行过滤
+    return "\n".join(lines).strip()
 
-def escape_latex(text: str) -> str:
-    """转义普通段落中的 LaTeX 特殊字符"""
-    text = text.replace('\\', LATEX_SPECIAL['\\'])
-    for ch, rep in LATEX_SPECIAL.items():
-        if ch == '\\':
-            continue
-        text = text.replace(ch, rep)
-    return text
 
+@lru_cache(maxsize=None)
+def _which(name: str) -> Optional[str]:
+    """编译器路径在进程内只查找一次（shutil.which 每次都要遍历 PATH 逐个 stat）"""
+    return shutil.which(name)
 
-def markdown_to_latex(md: str) -> str:
-    """
-    改进的 Markdown -> LaTeX 转换：
-    - # 姓名 -> 大标题居中显示
-    - ## 章节 -> \section
-    - ### 子章节 -> \subsection
-    - 列表行以 -, *, • 开头 -> itemize (使用 enumitem 改进格式)
-    - 行内 `code` -> \texttt{}
-    - **bold** -> \textbf{}
-    - *italic* -> \textit{}
-    - [text](url) -> \href{url}{text}
-    - 三引号代码块 ``` -> verbatim
-    - 防止长文本溢出
-    """
-    import re
-    lines = md.splitlines()
-    out = []
-    in_verbatim = False
-    in_itemize = False
-    in_minipage = False  # 跟踪是否在minipage环境中
-    is_first_line = True  # 标记第一行（姓名）
-
-    def flush_itemize(check_next=True):
-        nonlocal in_itemize, in_minipage
-        if in_itemize:
-            out.append(r'\end{itemize}')
-            in_itemize = False
-            # 如果列表结束且下一行不是列表项，关闭minipage
-            if in_minipage and check_next and i < len(lines):
-                next_line = lines[i].strip() if i < len(lines) else ""
-                if not next_line or next_line.startswith('#') or re.match(r'^\s*\*\*', next_line):
-                    out.append(r'\end{minipage}')
-                    in_minipage = False
-
-    def process_inline_formatting(text: str) -> str:
-        """处理行内格式：粗体、斜体、代码、链接，并修复符号前后空白"""
-        placeholders = {}
-        placeholder_counter = [0]
-
-        def get_placeholder():
-            placeholder_counter[0] += 1
-            return f"PLACEHOLDER{placeholder_counter[0]}PLACEHOLDER"
-
-        # inline code
-        def repl_inline_code(m):
-            placeholder = get_placeholder()
-            inner = m.group(1)
-            inner = inner.replace('\\', r'\textbackslash{}').replace('{', r'\{').replace('}', r'\}')
-            placeholders[placeholder] = r'\texttt{' + inner + '}'
-            return placeholder
-
-        text = re.sub(r'`([^`]+)`', repl_inline_code, text)
-
-        # links
-        def repl_link(m):
-            placeholder = get_placeholder()
-            link_text = m.group(1)
-            link_url = m.group(2)
-            link_url_escaped = (
-                link_url.replace('\\', r'\textbackslash{}')
-                .replace('{', r'\{').replace('}', r'\}')
-                .replace('#', r'\#').replace('$', r'\$').replace('%', r'\%')
-                .replace('&', r'\&').replace('_', r'\_').replace('^', r'\^{}')
-                .replace('~', r'\~{}')
-            )
-            placeholders[placeholder] = r'\href{' + link_url_escaped + '}{' + escape_latex(link_text) + '}'
-            return placeholder
 
-        text = re.sub(r'$begin:math:display$\(\[\^$end:math:display$]+\]$begin:math:text$\(\[\^$end:math:text$]+\)', repl_link, text)
-
-        # bold
-        def repl_bold(m):
-            placeholder = get_placeholder()
-            placeholders[placeholder] = r'\textbf{' + escape_latex(m.group(1)) + '}'
-            return placeholder
+def _move_file(src: Path, dst: Path) -> None:
+    """同一文件系统内 os.replace 只改目录项；跨设备（如 /tmp 是 tmpfs）时退回复制"""
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.move(str(src), str(dst))
 
-        text = re.sub(r'\*\*([^\*]+)\*\*', repl_bold, text)
-        text = re.sub(r'__([^_]+)__', repl_bold, text)
 
-        # italic
-        def repl_italic(m):
-            placeholder = get_placeholder()
-            placeholders[placeholder] = r'\textit{' + escape_latex(m.group(1)) + '}'
-            return placeholder
+# 同时运行的 LaTeX 编译数上限（默认 CPU 核数）
+_LATEX_MAX_WORKERS = int(os.getenv("LATEX_MAX_WORKERS", str(os.cpu_count() or 2)))
+_LATEX_SLOTS = threading.BoundedSemaphore(_LATEX_MAX_WORKERS)
 
-        text = re.sub(r'(?<!\*)\*([^\*]+)\*(?!\*)', repl_italic, text)
-        text = re.sub(r'(?<!_)_([^_]+)_(?!_)', repl_italic, text)
+_FMT_LOCK = threading.Lock()
+# 生成或加载失败过的格式名：本进程内不再尝试
+_FMT_FAILED: set = set()
 
-        # 修复符号前后的空白
-        text = re.sub(r'([^\s~\-])\s+\+\s+([^\s~\-])', r'\1~+~\2', text)
-        text = re.sub(r'([^\s~\-])\s+-\s+([^\s~\-])', r'\1~-~\2', text)
-        text = re.sub(r'([^\s~])\s+=\s+([^\s~])', r'\1~=~\2', text)
-        text = re.sub(r'([^\s~])\s+<\s+([^\s~])', r'\1~<~\2', text)
-        text = re.sub(r'([^\s~])\s+>\s+([^\s~])', r'\1~>~\2', text)
 
-        text = escape_latex(text)
+@lru_cache(maxsize=8)
+def _format_name(preamble: str) -> str:
+    """前言内容 -> 格式名；模板前言只有中/英两种，摘要计算一次后复用"""
+    return "resume-" + hashlib.sha1(preamble.encode("utf-8")).hexdigest()[:12]
 
-        for placeholder, replacement in placeholders.items():
-            text = text.replace(placeholder, replacement)
 
-        return text
+def _pdflatex_format(pdflatex_bin: str, tex_content: str, timeout_sec: int) -> Optional[str]:
+    """
+    用 mylatexformat 把模板前言（\\begin{document} 之前的部分）预编译成 pdflatex 格式文件，
+    之后每次编译用 -fmt 直接载入，跳过逐个加载宏包。格式名取前言内容的哈希，模板变化后自动重建。
+    返回格式名；前言依赖 fontspec（只能用 XeLaTeX/LuaLaTeX）或生成失败时返回 None。
+    """
+    head, sep, _ = tex_content.partition(r"\begin{document}")
+    if not sep or "fontspec" in head:
+        return None
+    preamble = head + sep
+    name = _format_name(preamble)
+    cache_dir = Path(Config.CACHE_DIR)
+    fmt_path = cache_dir / f"{name}.fmt"
+    if name in _FMT_FAILED:
+        return None
+    if fmt_path.exists():
+        return name
+
+    with _FMT_LOCK:
+        if fmt_path.exists():
+            return name
+        if name in _FMT_FAILED:
+            return None
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / f"{name}.tex"
+            src.write_bytes((preamble + "\n\\end{document}\n").encode("utf-8"))
+            cmd = [pdflatex_bin, "-ini", f"-jobname={name}", "-interaction=nonstopmode",
+                   "&pdflatex", "mylatexformat.ltx", src.name]
+            logger.info(f"Building pdflatex format: {' '.join(cmd)}")
+            try:
+                proc = subprocess.run(
+                    cmd, cwd=tmpdir, stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT, text=True, timeout=timeout_sec
+                )
+            except subprocess.TimeoutExpired:
+                proc = None
+            built = Path(tmpdir) / f"{name}.fmt"
+            if proc is None or proc.returncode != 0 or not built.exists():
+                logger.warning(f"生成 pdflatex 格式文件失败（将使用普通编译）: {name}")
+                _FMT_FAILED.add(name)
+                return None
+            _move_file(built, fmt_path)
+    return name
+
+
+def _run_pdflatex(pdflatex_bin: str, tex_name: str, cwd: Path, timeout_sec: int,
+                  fmt_name: Optional[str] = None) -> Tuple[bool, str]:
+    """连续跑两遍 pdflatex（交叉引用需要），返回 (是否成功, 合并日志)"""
+    cmd = [pdflatex_bin, "-interaction=nonstopmode", tex_name]
+    env = None
+    if fmt_name:
+        cmd.insert(1, f"-fmt={fmt_name}")
+        # 末尾的路径分隔符表示在缓存目录之后继续搜索默认格式路径
+        env = {**os.environ, "TEXFORMATS": f"{Config.CACHE_DIR}{os.pathsep}"}
+    try:
+        logger.info(f"Running pdflatex: {' '.join(cmd)} (1/2)")
+        p1 = subprocess.run(
+            cmd, cwd=cwd, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, timeout=timeout_sec, env=env
+        )
+        logger.info(f"Running pdflatex: {' '.join(cmd)} (2/2)")
+        p2 = subprocess.run(
+            cmd, cwd=cwd, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, timeout=timeout_sec, env=env
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"LaTeX 编译超过 {timeout_sec}s 超时。")
+    log = (p1.stdout or "") + "\n" + (p2.stdout or "")
+    return p2.returncode == 0, log
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
 
-        # ``` 代码块
-        if re.match(r'\s*```', line):
-            flush_itemize()
-            if not in_verbatim:
-                out.append(r'\begin{verbatim}')
-                in_verbatim = True
-            else:
-                out.append(r'\end{verbatim}')
-                in_verbatim = False
-            i += 1
-            continue
-
-        if in_verbatim:
-            out.append(line)
-            i += 1
-            continue
-
-        # 标题处理
-        if line.startswith('### '):
-            flush_itemize()
-            title_text = process_inline_formatting(line[4:].strip())
-            out.append(r'\subsubsection{' + title_text + '}')
-            i += 1
-            continue
-        if line.startswith('## '):
-            flush_itemize()
-            title_text = process_inline_formatting(line[3:].strip())
-            out.append(r'\section{' + title_text + '}')
-            i += 1
-            continue
-        if line.startswith('# '):
-            flush_itemize()
-            title_text = process_inline_formatting(line[2:].strip())
-            if is_first_line:
-                out.append(r'\begin{tabularx}{\linewidth}{@{} C @{}}')
-                out.append(r'\Huge{' + title_text + r'} \\[7.5pt]')
-                is_first_line = False
-                i += 1
-                # 下一行如果是联系方式
-                if i < len(lines) and lines[i].strip() and not lines[i].startswith('#'):
-                    contact_line = lines[i].strip()
-                    contact_parts = [p.strip() for p in contact_line.split('|')]
-                    contact_latex = []
-                    for part in contact_parts:
-                        part_processed = process_inline_formatting(part)
-                        contact_latex.append(part_processed)
-                    contact_text = r' \ $|$ \ '.join(contact_latex)
-                    out.append(contact_text + r' \\')
-                    i += 1
-                out.append(r'\end{tabularx}')
-                continue
-            else:
-                out.append(r'\section{' + title_text + '}')
-                i += 1
-                continue
-
-        # 列表项
-        list_match = re.match(r'^\s*([-*•])\s+', line)
-        if list_match:
-            if not in_itemize:
-                if out and out[-1].strip().endswith(r'\end{tabularx}'):
-                    out.append(r'\begin{minipage}[t]{\linewidth}')
-                    in_minipage = True
-                out.append(r'\begin{itemize}[nosep,after=\strut, leftmargin=1em, itemsep=3pt,label=--]')
-                in_itemize = True
-            item_text = re.sub(r'^\s*([-*•])\s+', '', line)
-            item_text = process_inline_formatting(item_text)
-            out.append(r'\item ' + item_text)
-            i += 1
-            continue
-        else:
-            flush_itemize()
-
-        # 空行
-        if not line.strip():
-            out.append('')
-            i += 1
-            continue
-
-        # 工作经历/项目标题
-        job_match = re.match(r'^\s*\*\*([^\*]+)\*\*\s*$begin:math:text$\(\[\^$end:math:text$]+\)', line)
-        if job_match:
-            flush_itemize()
-            job_title = job_match.group(1).strip()
-            job_time = job_match.group(2).strip()
-            out.append(r'\begin{tabularx}{\linewidth}{@{}l X r@{}}')
-            out.append(
-                r'\textbf{' + escape_latex(job_title) + r'} & \hfill & ' + escape_latex(job_time) + r' \\[3.75pt]')
-            out.append(r'\end{tabularx}')
-            i += 1
-            continue
-
-        # 普通段落
-        processed_line = process_inline_formatting(line)
-        out.append(processed_line)
-        i += 1
-
-    flush_itemize(check_next=False)
-    if in_minipage:
-        out.append(r'\end{minipage}')
-    return '\n'.join(out)
-
-
-def wrap_into_template(body: str, chinese: bool = True) -> str:
+@lru_cache(maxsize=None)
+def _tectonic_env() -> Dict[str, str]:
     """
-    使用改进的 LaTeX 模板，参考专业简历格式，防止内容溢出
+    tectonic 子进程环境：未显式设置 TECTONIC_CACHE_DIR 时固定到 CACHE_DIR/tectonic，
+    宏包与格式缓存跨请求、跨重启共享（容器中 HOME 不可写或每次重建时尤其重要）
     """
-    preamble = r"""
-\documentclass[a4paper,12pt]{article}
-\usepackage{url}
-\usepackage{parskip}
-\RequirePackage{color}
-\RequirePackage{graphicx}
-\usepackage[usenames,dvipsnames]{xcolor}
-\usepackage[scale=0.9]{geometry}
-\usepackage{tabularx}
-\usepackage{enumitem}
-\usepackage{supertabular}
-\usepackage{titlesec}
-\usepackage{multicol}
-\usepackage{multirow}
-"""
-
-    if chinese:
-        preamble += r"""
-\usepackage{fontspec}
-% 设置中文字体为默认字体
-\setmainfont{PingFang SC}[Ligatures=TeX]
-\newfontfamily\cnfont{PingFang SC}
-"""
-    else:
-        preamble += r"""
-\usepackage[T1]{fontenc}
-\usepackage{lmodern}
-"""
-
-    preamble += r"""
-% 自定义章节格式
-"""
-    if chinese:
-        preamble += r"""
-\titleformat{\section}{\Large\bfseries\raggedright}{}{0em}{}[\titlerule]
-\titlespacing{\section}{0pt}{10pt}{10pt}
-"""
-    else:
-        preamble += r"""
-\titleformat{\section}{\Large\scshape\raggedright}{}{0em}{}[\titlerule]
-\titlespacing{\section}{0pt}{10pt}{10pt}
-"""
-
-    preamble += r"""
-% 超链接设置
-\usepackage[unicode, draft=false]{hyperref}
-\definecolor{linkcolour}{rgb}{0,0.2,0.6}
-\hypersetup{colorlinks,breaklinks,urlcolor=linkcolour,linkcolor=linkcolour}
-
-% 防止溢出
-\newcolumntype{C}{>{\centering\arraybackslash}X}
-\newlength{\fullcollw}
-\setlength{\fullcollw}{0.47\textwidth}
-
-% 工作经历环境定义
-\newenvironment{jobshort}[2]
-    {
-    \begin{tabularx}{\linewidth}{@{}l X r@{}}
-    \textbf{#1} & \hfill &  #2 \\[3.75pt]
-    \end{tabularx}
-    }
-    {
-    }
-
-\newenvironment{joblong}[2]
-    {
-    \begin{tabularx}{\linewidth}{@{}l X r@{}}
-    \textbf{#1} & \hfill &  #2 \\[3.75pt]
-    \end{tabularx}
-    \begin{minipage}[t]{\linewidth}
-    \begin{itemize}[nosep,after=\strut, leftmargin=1em, itemsep=3pt,label=--]
-    }
-    {
-    \end{itemize}
-    \end{minipage}    
-    }
+    cache_dir = os.environ.get("TECTONIC_CACHE_DIR") or os.path.join(Config.CACHE_DIR, "tectonic")
+    os.makedirs(cache_dir, exist_ok=True)
+    return {**os.environ, "TECTONIC_CACHE_DIR": cache_dir}
 
-% 页面设置
-\pagestyle{empty}
-\setlength{\parskip}{6pt}
-\setlength{\parindent}{0pt}
-\raggedright
-\sloppy
-\emergencystretch=3em
-\tolerance=1000
-\hbadness=10000
 
-\setlength{\lineskip}{0pt}
-\setlength{\baselineskip}{1.1\baselineskip}
+def _tectonic_cmd(tectonic_bin: str, outdir: Path, tex_path: Path) -> list:
+    # --chatter=minimal：只输出警告与错误，减少需要捕获的 stdout
+    return [tectonic_bin, "--chatter=minimal", "--outdir", str(outdir), str(tex_path)]
 
-\binoppenalty=10000
-\relpenalty=10000
 
-\begin{document}
-"""
+def _prewarm_latex_formats() -> None:
+    """
+    预热 LaTeX 编译：有 tectonic 时各编译一份最小中英文文档，把宏包 / 字体 / 格式下载进缓存；
+    否则预先生成 pdflatex 模板前言格式文件。首个请求不必承担这部分开销。
+    """
+    tectonic_bin = _which("tectonic")
+    if tectonic_bin:
+        for chinese in (True, False):
+            try:
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    tex_path = Path(tmpdir) / "warmup.tex"
+                    tex_path.write_bytes(wrap_into_template("warmup", chinese=chinese).encode("utf-8"))
+                    subprocess.run(
+                        _tectonic_cmd(tectonic_bin, Path(tmpdir), tex_path), cwd=tmpdir,
+                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=600, env=_tectonic_env(),
+                    )
+            except Exception as exc:  # pragma: no cover - 预热失败不影响服务
+                logger.warning(f"预热 tectonic 缓存失败: {exc}")
+        return
+
+    pdflatex_bin = _which("pdflatex")
+    if not pdflatex_bin:
+        return
+    for chinese in (True, False):
+        try:
+            _pdflatex_format(pdflatex_bin, wrap_into_template("", chinese=chinese), 300)
+        except Exception as exc:  # pragma: no cover - 预热失败不影响服务
+            logger.warning(f"预热 LaTeX 格式文件失败: {exc}")
 
-    if chinese:
-        content = r"{\cnfont" + "\n" + body + "\n}"
-    else:
-        content = body
 
-    return preamble + content + r"""
-\end{document}
-"""
+@bp.record_once
+def _schedule_latex_prewarm(state) -> None:
+    # 蓝图首次注册时在后台线程预热；LATEX_PREWARM=0 可关闭（如单测或只跑部分接口时）
+    if os.getenv("LATEX_PREWARM", "1") == "0":
+        return
+    threading.Thread(target=_prewarm_latex_formats, name="latex-prewarm", daemon=True).start()
 
 
 def compile_latex_to_pdf(tex_content: str, file_id: str, timeout_sec: int = 300) -> Tuple[str, str, str]:
     """
     写入 .tex，调用 tectonic（优先）或 pdflatex 编译 pdf。失败抛出详细错误。
+    直接在输出目录中编译（tectonic --outdir / pdflatex 以输出目录为工作目录），
+    不再经过临时目录再移动；编译中间文件（.aux/.log 等）结束后统一清理。
     返回: (final_tex_path, final_pdf_path, file_id)
     """
     ensure_dirs()
     upload_dir = Path(getattr(Config, "UPLOAD_DIR", getattr(Config, "OUTPUT_DIR", "uploads")))
     upload_dir.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir_path = Path(tmpdir)
-        tex_path = tmpdir_path / f"{file_id}.tex"
-        pdf_path_tmp = tmpdir_path / f"{file_id}.pdf"
+    tex_path = upload_dir / f"{file_id}.tex"
+    pdf_path = upload_dir / f"{file_id}.pdf"
 
-        tex_path.write_text(tex_content, encoding="utf-8")
+    # 一次编码后按字节写入，不经过文本层 TextIOWrapper
+    tex_path.write_bytes(tex_content.encode("utf-8"))
 
-        tectonic_bin = shutil.which("tectonic")
-        if tectonic_bin:
-            cmd = [tectonic_bin, "--keep-logs", "--keep-intermediates", str(tex_path)]
-            logger.info(f"Running tectonic: {' '.join(cmd)}")
-            try:
-                proc = subprocess.run(
-                    cmd, cwd=tmpdir_path, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                    text=True, timeout=timeout_sec
-                )
-            except subprocess.TimeoutExpired:
-                raise RuntimeError(f"LaTeX 编译超过 {timeout_sec}s 超时（可能在下载宏包/字体或被某宏包阻塞）。")
-            if proc.returncode != 0 or not pdf_path_tmp.exists():
-                raise RuntimeError(f"tectonic 编译失败：\n{proc.stdout}")
-        else:
-            pdflatex_bin = shutil.which("pdflatex")
-            if not pdflatex_bin:
-                raise RuntimeError("找不到 LaTeX 编译器：请安装 'tectonic' 或 'pdflatex'（TeX Live/MacTeX）。")
-            cmd = [pdflatex_bin, "-interaction=nonstopmode", tex_path.name]
-            try:
-                logger.info(f"Running pdflatex: {' '.join(cmd)} (1/2)")
-                p1 = subprocess.run(
-                    cmd, cwd=tmpdir_path, stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT, text=True, timeout=timeout_sec
-                )
-                logger.info(f"Running pdflatex: {' '.join(cmd)} (2/2)")
-                p2 = subprocess.run(
-                    cmd, cwd=tmpdir_path, stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT, text=True, timeout=timeout_sec
-                )
-            except subprocess.TimeoutExpired:
-                raise RuntimeError(f"LaTeX 编译超过 {timeout_sec}s 超时。")
-            if p2.returncode != 0 or not pdf_path_tmp.exists():
-                log = (p1.stdout or "") + "\n" + (p2.stdout or "")
-                raise RuntimeError(f"pdflatex 编译失败：\n{log}")
+    ok = False
+    try:
+        # 同时运行的 TeX 引擎数受 _LATEX_SLOTS 限制，超出的请求在此排队，
+        # 避免突发并发时同时拉起大量引擎进程争抢 CPU / 内存
+        with _LATEX_SLOTS:
+            tectonic_bin = _which("tectonic")
+            if tectonic_bin:
+                cmd = _tectonic_cmd(tectonic_bin, upload_dir, tex_path)
+                logger.info(f"Running tectonic: {' '.join(cmd)}")
+                try:
+                    proc = subprocess.run(
+                        cmd, cwd=upload_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                        text=True, timeout=timeout_sec, env=_tectonic_env()
+                    )
+                except subprocess.TimeoutExpired:
+                    raise RuntimeError(f"LaTeX 编译超过 {timeout_sec}s 超时（可能在下载宏包/字体或被某宏包阻塞）。")
+                if proc.returncode != 0 or not pdf_path.exists():
+                    raise RuntimeError(f"tectonic 编译失败：\n{proc.stdout}")
+            else:
+                pdflatex_bin = _which("pdflatex")
+                if not pdflatex_bin:
+                    raise RuntimeError("找不到 LaTeX 编译器：请安装 'tectonic' 或 'pdflatex'（TeX Live/MacTeX）。")
+                # 优先使用预编译了模板前言的格式文件，加载失败时退回普通编译
+                fmt_name = _pdflatex_format(pdflatex_bin, tex_content, timeout_sec)
+                passed, log = False, ""
+                if fmt_name:
+                    passed, log = _run_pdflatex(pdflatex_bin, tex_path.name, upload_dir, timeout_sec, fmt_name)
+                    if not passed:
+                        logger.warning(f"使用格式文件 {fmt_name} 编译失败，改用普通 pdflatex 重试")
+                if not passed:
+                    passed, log = _run_pdflatex(pdflatex_bin, tex_path.name, upload_dir, timeout_sec)
+                    # 只有普通编译成功才说明问题出在格式文件（而不是正文），此后不再使用它
+                    if passed and fmt_name:
+                        with _FMT_LOCK:
+                            _FMT_FAILED.add(fmt_name)
+                if not passed or not pdf_path.exists():
+                    raise RuntimeError(f"pdflatex 编译失败：\n{log}")
+        ok = True
+    finally:
+        # 清理中间文件（同目录下的 .md 是生成结果，始终保留）；
+        # 编译失败时连同 .tex 和可能残留的半成品 .pdf 一并删除
+        keep = (".md", ".tex", ".pdf") if ok else (".md",)
+        for leftover in upload_dir.glob(f"{file_id}.*"):
+            if leftover.suffix not in keep:
+                leftover.unlink(missing_ok=True)
+
+    return str(tex_path), str(pdf_path), file_id
+
+
+# 生成简历时的系统提示词（按目标语言查表，不再每次请求重新拼接）
+_SYSTEM_PROMPT_ZH = (
+    "你是一位资深的简历优化专家和AI招聘助手。\n"
+    "请严格按照用户提供的详细要求生成简历。\n"
+    "关键要求：\n"
+    "1. 输出纯Markdown格式，不要包含代码块标记（不要用 ``` 包裹）\n"
+    "2. 第一行必须是候选人真实姓名，格式为：# 姓名\n"
+    "3. 第二行是联系方式，用 | 分隔\n"
+    "4. 使用 ## 作为章节标题\n"
+    "5. 所有客观信息必须严格遵照个人信息库，不能篡改或夸大\n"
+    "6. 使用STAR法则和量化指标描述经历\n"
+    "7. 所有内容必须使用中文"
+)
 
-        final_tex = upload_dir / f"{file_id}.tex"
-        final_pdf = upload_dir / f"{file_id}.pdf"
-        shutil.move(str(tex_path), str(final_tex))
-        shutil.move(str(pdf_path_tmp), str(final_pdf))
+_SYSTEM_PROMPT_EN = (
+    "You are a senior resume optimization expert and AI recruitment assistant.\n"
+    "Please strictly follow the detailed requirements provided by the user to generate the resume.\n"
+    "Key Requirements:\n"
+    "1. Output pure Markdown format, do NOT include code block markers (do NOT wrap in ```)\n"
+    "2. The first line must be the candidate's real name, formatted as: # Name\n"
+    "3. The second line is contact information, separated by |\n"
+    "4. Use ## for section headings\n"
+    "5. All objective information must strictly follow the personal information database, no modification or exaggeration allowed\n"
+    "6. Use STAR method and quantitative metrics to describe experiences\n"
+    "7. All content must be in English"
+)
 
-    return str(final_tex), str(final_pdf), file_id
+_SYSTEM_PROMPTS = {"zh": _SYSTEM_PROMPT_ZH, "en": _SYSTEM_PROMPT_EN}
 
 
 def gen_file_id(prefix: str = "resume") -> str:
     return f"{prefix}-{uuid.uuid4().hex[:12]}"
 
 
-# 主要 API：生成简历（支持：上传简历文件 或 手动简历 JSON + JD 文件）
-@bp.post("/api/resume/generate")
-def api_resume_generate():
+def _parse_generate_request() -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[Response, int]]]:
     """
-    输入：
-      - 必须：jobDescription 文件 (field: jobDescription)
-      - 二选一：
-        a) 上传简历文件 (field: resume)
-        b) 前端表单传 manualResume JSON (field: manualResume)
-
-    流程：
-      1. 保存原始文件到磁盘（若有简历文件）
-      2. 读取并截断 resume_text / jd_text
-      3. 检测语言、构造 prompt
-      4. 调用 Qwen 生成 Markdown 简历
-      5. Markdown -> LaTeX -> PDF，保存 .md / .pdf 到磁盘
-      6. 返回 generatedResume / downloadMd / downloadPdf / resumeSaved / jdSaved / warnings
+    解析上传文件 / manualResume，完成落盘、读取、截断、语言检测与 prompt 组装。
+    返回 (ctx, None)；参数错误时返回 (None, (json_response, status))。
     """
     ensure_dirs()
 
@@ -559,8 +438,9 @@ def api_resume_generate():
 
     if manual_resume_raw:
         try:
-            manual_resume = json.loads(manual_resume_raw)
-        except json.JSONDecodeError:
+            # 走应用的 JSON provider（安装了 orjson 时即为 orjson）；两种实现的解析错误都是 ValueError 子类
+            manual_resume = current_app.json.loads(manual_resume_raw)
+        except ValueError:
             logger.warning("manualResume 字段 JSON 解析失败，将忽略该字段")
             warnings.append("manualResume JSON parse error, ignored.")
             manual_resume = None
@@ -570,41 +450,48 @@ def api_resume_generate():
 
     # JD 必须有
     if not jd:
-        return jsonify({"success": False, "message": "Job description file is required."}), 400
+        return None, (jsonify({"success": False, "message": "Job description file is required."}), 400)
 
     # 校验扩展名
     if resume and not ext_ok(resume.filename):
-        return jsonify({"success": False, "message": "Unsupported resume file type"}), 400
+        return None, (jsonify({"success": False, "message": "Unsupported resume file type"}), 400)
     if not ext_ok(jd.filename):
-        return jsonify({"success": False, "message": "Unsupported job description file type"}), 400
+        return None, (jsonify({"success": False, "message": "Unsupported job description file type"}), 400)
 
     # 必须提供：简历文件 或 manualResume
     if not resume and not has_manual_resume_text:
-        return jsonify({"success": False, "message": "Provide either a resume file or manual resume data."}), 400
-
-    # 1) 保存原始文件（只有 resume / jd；manualResume 只是 JSON，不落盘）
-    if resume:
-        resume_path = save_file(resume, Config.RESUME_DIR)
-    else:
-        resume_path = None
-    jd_path = save_file(jd, Config.JD_DIR)
+        return None, (jsonify({"success": False, "message": "Provide either a resume file or manual resume data."}), 400)
 
-    # 2) 读取文本
-    if resume_path:
-        resume_text, w1 = read_text_from_file(resume_path)
-    else:
-        # 只用手动简历
-        resume_text = manual_resume_text
-        if not resume_text:
-            return jsonify({"success": False, "message": "Manual resume data is empty."}), 400
-        w1 = None
+    # 1) 保存原始文件并读取文本（只有 resume / jd；manualResume 只是 JSON，不落盘）
+    #    .txt 上传流只读一次，落盘与解码共用同一份字节；PDF/DOCX 仍落盘后解析
+    #    两份文件互不依赖：简历交给上传解析线程池，JD 在当前线程解析，PDF/DOCX 解析时间重叠
+    #    单个文件超过大小上限时 read_and_save 抛出 UploadTooLarge，按 413 返回
+    try:
+        if resume:
+            resume_future = read_and_save_async(resume, Config.RESUME_DIR)
+            try:
+                jd_path, jd_text, w2 = read_and_save(jd, Config.JD_DIR)
+            except Exception:
+                # 返回前先收尾简历读取（请求结束后上传流会被关闭），并删除已落盘的简历
+                discard_async_upload(resume_future)
+                raise
+            resume_path, resume_text, w1 = resume_future.result()
+        else:
+            resume_path = None
+            # 只用手动简历
+            resume_text = manual_resume_text
+            if not resume_text:
+                return None, (jsonify({"success": False, "message": "Manual resume data is empty."}), 400)
+            w1 = None
+            jd_path, jd_text, w2 = read_and_save(jd, Config.JD_DIR)
+    except UploadTooLarge as exc:
+        return None, (jsonify({"success": False, "message": str(exc)}), 413)
 
-    jd_text, w2 = read_text_from_file(jd_path)
     warnings.extend([w for w in (w1, w2) if w])
 
     # 3) 截断
-    resume_text, w3 = truncate_text(resume_text, Config.MAX_INPUT_CHARS)
-    jd_text, w4 = truncate_text(jd_text, Config.MAX_INPUT_CHARS)
+    resume_text, w3 = truncate_text(resume_text, _MAX_INPUT_CHARS)
+    jd_text, w4 = truncate_text(jd_text, _MAX_INPUT_CHARS)
     warnings.extend([w for w in (w3, w4) if w])
 
     # 4) 检测语言
@@ -613,97 +500,331 @@ def api_resume_generate():
     target_lang = jd_lang if jd_lang == resume_lang else (jd_lang if jd_lang == 'zh' else resume_lang)
     logger.info(f"检测到简历语言: {resume_lang}, JD语言: {jd_lang}, 使用目标语言: {target_lang}")
 
-    # 5) 组装 Prompt
-    base_prompt = build_resume_prompt(resume_text, jd_text, language=target_lang)
-
-    # 文件前缀
-    file_id = gen_file_id()
-
-    # 6) 系统提示词
-    if target_lang == 'zh':
-        system_prompt = (
-            "你是一位资深的简历优化专家和AI招聘助手。\n"
-            "请严格按照用户提供的详细要求生成简历。\n"
-            "关键要求：\n"
-            "1. 输出纯Markdown格式，不要包含代码块标记（不要用 ``` 包裹）\n"
-            "2. 第一行必须是候选人真实姓名，格式为：# 姓名\n"
-            "3. 第二行是联系方式，用 | 分隔\n"
-            "4. 使用 ## 作为章节标题\n"
-            "5. 所有客观信息必须严格遵照个人信息库，不能篡改或夸大\n"
-            "6. 使用STAR法则和量化指标描述经历\n"
-            "7. 所有内容必须使用中文"
+    # 5) 组装 Prompt（系统提示词按语言查表）
+    messages = [
+        {"role": "system", "content": _SYSTEM_PROMPTS[target_lang]},
+        {"role": "user", "content": build_resume_prompt(resume_text, jd_text, language=target_lang)},
+    ]
+
+    model = os.getenv("QWEN_MODEL", "qwen-plus")
+    return {
+        "file_id": gen_file_id(),
+        "target_lang": target_lang,
+        "model": model,
+        "messages": messages,
+        # ?force=1：忽略缓存，强制重新调用模型
+        "use_cache": request.args.get("force") != "1",
+        # ?asyncPdf=1：Markdown 写完即返回，PDF 在后台编译
+        "defer_pdf": request.args.get("asyncPdf") == "1",
+        "resume_path": resume_path,
+        "jd_path": jd_path,
+        "warnings": warnings,
+    }, None
+
+
+def _compile_pdf(file_id: str, generated_md: str, target_lang: str) -> Dict[str, Any]:
+    """Markdown -> LaTeX -> PDF，失败抛出异常；同步流程与后台 PDF 任务共用"""
+    latex_body = markdown_to_latex(generated_md)
+    latex_text = wrap_into_template(latex_body, chinese=(target_lang == 'zh'))
+    _, pdf_path, _ = compile_latex_to_pdf(latex_text, file_id)
+    file_registry.register(pdf_path)
+    logger.info(f"PDF 生成成功: {pdf_path}")
+    return {"file_id": file_id, "pdf_path": pdf_path}
+
+
+def _pdf_job_id(file_id: str) -> str:
+    return f"pdf-{file_id}"
+
+
+def _write_outputs(ctx: Dict[str, Any], generated_md: str) -> bool:
+    """
+    保存 Markdown 并尝试编译 PDF（失败只记 warning），返回是否生成了 PDF。
+    ctx["defer_pdf"] 为真时只提交后台编译任务并返回 False，由 pdf-status 接口查询结果。
+    不依赖请求上下文，可在后台任务线程中调用。
+    """
+    file_id = ctx["file_id"]
+
+    # 8) 保存 Markdown：交给 I/O 线程池，与下面的 LaTeX 编译重叠执行
+    upload_dir = Path(getattr(Config, "UPLOAD_DIR", getattr(Config, "OUTPUT_DIR", "uploads")))
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    md_path = upload_dir / f"{file_id}.md"
+    md_future = _io_pool.submit(md_path.write_bytes, generated_md.encode("utf-8"))
+
+    # 9) 尝试生成 PDF
+    has_pdf = False
+    if ctx.get("defer_pdf"):
+        from app.services.resume_jobs import submit_job
+
+        submit_job(
+            _pdf_job_id(file_id), _compile_pdf, file_id, generated_md, ctx["target_lang"],
+            label="PDF 编译任务", warn_on_failure=True,
         )
+        logger.info(f"PDF 编译任务已提交，file_id: {file_id}")
     else:
-        system_prompt = (
-            "You are a senior resume optimization expert and AI recruitment assistant.\n"
-            "Please strictly follow the detailed requirements provided by the user to generate the resume.\n"
-            "Key Requirements:\n"
-            "1. Output pure Markdown format, do NOT include code block markers (do NOT wrap in ```)\n"
-            "2. The first line must be the candidate's real name, formatted as: # Name\n"
-            "3. The second line is contact information, separated by |\n"
-            "4. Use ## for section headings\n"
-            "5. All objective information must strictly follow the personal information database, no modification or exaggeration allowed\n"
-            "6. Use STAR method and quantitative metrics to describe experiences\n"
-            "7. All content must be in English"
-        )
+        try:
+            logger.info("开始生成 PDF...")
+            _compile_pdf(file_id, generated_md, ctx["target_lang"])
+            has_pdf = True
+        except Exception as latex_err:
+            logger.warning(f"PDF 生成失败（不影响主流程）: {latex_err}")
+            ctx["warnings"].append(f"PDF generation skipped: {latex_err}")
+
+    # 返回前确认 Markdown 已写完（写入异常在这里抛出）
+    md_future.result()
+    file_registry.register(md_path)
+    logger.info(f"Markdown 文件已保存: {md_path}")
+    return has_pdf
+
+
+def _result_payload(ctx: Dict[str, Any], generated_md: str, has_pdf: bool) -> Dict[str, Any]:
+    """组装成功响应体（下载链接在请求上下文中生成）"""
+    file_id = ctx["file_id"]
+    download_md = url_for("uploads.download_file", file_name=f"{file_id}.md", _external=True)
+    download_pdf = (
+        url_for("uploads.download_file", file_name=f"{file_id}.pdf", _external=True)
+        if has_pdf else None
+    )
+    payload = {
+        "success": True,
+        "generatedResume": generated_md,
+        "fileId": file_id,
+        "downloadMd": download_md,
+        "downloadPdf": download_pdf,  # 可能为 None
+        "resumeSaved": ctx["resume_path"],   # 可能为 None（手动模式）
+        "jdSaved": ctx["jd_path"],
+        "warnings": ctx["warnings"],
+    }
+    if ctx.get("defer_pdf"):
+        payload["pdfStatus"] = "pending"
+        payload["pdfStatusUrl"] = url_for("resume.api_resume_pdf_status", file_id=file_id, _external=True)
+    return payload
+
+
+def _generate_markdown(ctx: Dict[str, Any]) -> str:
+    """7) 调用 Qwen 生成 Markdown（非流式，相同 prompt 命中缓存时跳过调用），返回去掉代码块包裹后的内容"""
+    logger.info(f"开始调用 Qwen API 生成简历，file_id: {ctx['file_id']}")
+    raw_md = llm_cache.get_or_generate(
+        get_qwen_client,  # 延迟初始化，确保读取到最新的环境变量；命中缓存时不创建
+        ctx["messages"],
+        model=ctx["model"],
+        temperature=_TEMPERATURE,
+        force=not ctx["use_cache"],
+    )
+    return strip_code_fences(raw_md)
+
+
+def _run_generation_job(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """后台任务：生成 Markdown 并落盘 / 编译 PDF，结果供状态接口组装响应"""
+    generated_md = _generate_markdown(ctx)
+    if not generated_md:
+        raise RuntimeError("生成的简历内容为空，请重试")
+    has_pdf = _write_outputs(ctx, generated_md)
+    logger.info(f"简历生成完成，file_id: {ctx['file_id']}")
+    return {
+        "file_id": ctx["file_id"],
+        "resume_path": ctx["resume_path"],
+        "jd_path": ctx["jd_path"],
+        "warnings": ctx["warnings"],
+        "generated_md": generated_md,
+        "has_pdf": has_pdf,
+        "defer_pdf": bool(ctx.get("defer_pdf")),
+    }
 
+
+def _sse(event: Dict[str, Any]) -> str:
+    """把一个事件编码成一条 SSE data 行（JSON，避免换行破坏帧格式）"""
+    return f"data: {current_app.json.dumps(event)}\n\n"
+
+
+# 流式模式下执行落盘 / PDF 编译的线程池（与 _io_pool 分开：_write_outputs 内部还会向 _io_pool 提交写文件任务）
+_stream_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="resume-stream")
+# 等待 PDF 编译期间发送 SSE 保活注释的间隔（秒）
+_SSE_KEEPALIVE_SECONDS = 10
+
+
+def _stream_generation(ctx: Dict[str, Any]) -> Iterator[str]:
+    """
+    流式模式：模型每产出一段就推送 {"type": "delta"}，
+    生成结束后推送 {"type": "progress", "stage": "compiling"} 并落盘 / 编译 PDF，
+    最后推送 {"type": "done", ...完整响应体}。
+    """
+    file_id = ctx["file_id"]
     try:
-        # 7) 调用 Qwen 生成 Markdown
-        logger.info(f"开始调用 Qwen API 生成简历，file_id: {file_id}")
-        client = get_qwen_client()  # 延迟初始化，确保读取到最新的环境变量
-        completion = client.chat.completions.create(
-            model=os.getenv("QWEN_MODEL", "qwen-plus"),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": base_prompt},
-            ],
-            temperature=0.3,
-        )
+        yield _sse({"type": "progress", "stage": "generating"})
+        key = llm_cache.cache_key(ctx["messages"], ctx["model"], _TEMPERATURE)
+        cached = llm_cache.get(key) if ctx["use_cache"] else None
+        if cached is not None:
+            # 命中缓存：整份内容作为一个 delta 推送
+            logger.info(f"命中大模型输出缓存，跳过 Qwen API 调用，file_id: {file_id}")
+            generated_md = strip_code_fences(cached)
+            yield _sse({"type": "delta", "content": generated_md})
+        else:
+            logger.info(f"开始调用 Qwen API（流式）生成简历，file_id: {file_id}")
+            client = get_qwen_client()
+            stream = client.chat.completions.create(
+                model=ctx["model"],
+                messages=ctx["messages"],
+                temperature=_TEMPERATURE,
+                stream=True,
+            )
 
-        raw_md = completion.choices[0].message.content or ""
-        generated_md = strip_code_fences(raw_md)
+            parts = []
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content or ""
+                if piece:
+                    parts.append(piece)
+                    yield _sse({"type": "delta", "content": piece})
+
+            raw_md = "".join(parts)
+            if raw_md:
+                llm_cache.put(key, raw_md)
+            generated_md = strip_code_fences(raw_md)
 
         if not generated_md:
             logger.warning("Qwen API 返回的内容为空")
-            return jsonify({"success": False, "message": "生成的简历内容为空，请重试"}), 500
+            yield _sse({"type": "error", "message": "生成的简历内容为空，请重试"})
+            return
 
         logger.info(f"Qwen API 返回内容长度: {len(generated_md)} 字符")
+        # 落盘 / 编译 PDF 放到后台线程，期间定时发送 SSE 注释保活，
+        # 避免编译耗时较长时前端或反向代理判定连接空闲而断开
+        yield _sse({"type": "progress", "stage": "compiling"})
+        outputs_future = _stream_pool.submit(_write_outputs, ctx, generated_md)
+        while True:
+            try:
+                has_pdf = outputs_future.result(timeout=_SSE_KEEPALIVE_SECONDS)
+                break
+            except FutureTimeoutError:
+                yield ": keepalive\n\n"
+        logger.info(f"简历生成完成，file_id: {file_id}")
+        yield _sse({"type": "done", **_result_payload(ctx, generated_md, has_pdf)})
+    except Exception as e:
+        logger.exception("调用 Qwen API / LaTeX 编译失败")
+        yield _sse({"type": "error", "message": f"生成失败: {e}"})
 
-        # 8) 保存 Markdown
-        upload_dir = Path(getattr(Config, "UPLOAD_DIR", getattr(Config, "OUTPUT_DIR", "uploads")))
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        md_path = upload_dir / f"{file_id}.md"
-        md_path.write_text(generated_md, encoding="utf-8")
-        download_md = url_for("uploads.download_file", file_name=f"{file_id}.md", _external=True)
-        logger.info(f"Markdown 文件已保存: {md_path}")
-
-        # 9) 尝试生成 PDF
-        download_pdf = None
-        try:
-            logger.info("开始生成 PDF...")
-            latex_body = markdown_to_latex(generated_md)
-            latex_text = wrap_into_template(latex_body, chinese=(target_lang == 'zh'))
 
-            tex_path, pdf_path, _ = compile_latex_to_pdf(latex_text, file_id)
-            download_pdf = url_for("uploads.download_file", file_name=f"{file_id}.pdf", _external=True)
-            logger.info(f"PDF 生成成功: {pdf_path}")
-        except Exception as latex_err:
-            logger.warning(f"PDF 生成失败（不影响主流程）: {latex_err}")
-            warnings.append(f"PDF generation skipped: {latex_err}")
+# 主要 API：生成简历（支持：上传简历文件 或 手动简历 JSON + JD 文件）
+@bp.post("/api/resume/generate")
+def api_resume_generate():
+    """
+    输入：
+      - 必须：jobDescription 文件 (field: jobDescription)
+      - 二选一：
+        a) 上传简历文件 (field: resume)
+        b) 前端表单传 manualResume JSON (field: manualResume)
+      - 可选：?stream=1 以 text/event-stream 逐段返回模型输出
+      - 可选：?async=1 提交后台任务立即返回 202 + jobId，
+        通过 GET /api/resume/status/<jobId> 轮询结果
+      - 可选：?force=1 忽略生成结果缓存，强制重新调用模型
+      - 可选：?asyncPdf=1 不等待 PDF 编译，响应中 downloadPdf 为 None、pdfStatus 为 pending，
+        通过 GET /api/resume/pdf-status/<fileId> 查询 PDF 是否就绪
+
+    流程：
+      1. 保存原始文件到磁盘（若有简历文件）
+      2. 读取并截断 resume_text / jd_text
+      3. 检测语言、构造 prompt
+      4. 调用 Qwen 生成 Markdown 简历
+      5. Markdown -> LaTeX -> PDF，保存 .md / .pdf 到磁盘
+      6. 返回 generatedResume / downloadMd / downloadPdf / resumeSaved / jdSaved / warnings
+    """
+    ctx, error = _parse_generate_request()
+    if error:
+        return error
+
+    if request.args.get("stream") == "1":
+        return Response(
+            stream_with_context(_stream_generation(ctx)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    if request.args.get("async") == "1":
+        from app.services.resume_jobs import submit_job
 
-        # 10) 返回
-        logger.info(f"简历生成完成，file_id: {file_id}, 返回成功响应")
+        job_id = submit_job(ctx["file_id"], _run_generation_job, ctx)
+        logger.info(f"简历生成任务已提交，job_id: {job_id}")
         return jsonify({
             "success": True,
-            "generatedResume": generated_md,
-            "fileId": file_id,
-            "downloadMd": download_md,
-            "downloadPdf": download_pdf,  # 可能为 None
-            "resumeSaved": resume_path,   # 可能为 None（手动模式）
-            "jdSaved": jd_path,
-            "warnings": warnings,
-        }), 200
+            "jobId": job_id,
+            "status": "pending",
+            "statusUrl": url_for("resume.api_resume_status", job_id=job_id, _external=True),
+        }), 202
+
+    try:
+        generated_md = _generate_markdown(ctx)
+
+        if not generated_md:
+            logger.warning("Qwen API 返回的内容为空")
+            return jsonify({"success": False, "message": "生成的简历内容为空，请重试"}), 500
+
+        logger.info(f"Qwen API 返回内容长度: {len(generated_md)} 字符")
+
+        # 8) ~ 10) 保存 Markdown、生成 PDF、返回
+        has_pdf = _write_outputs(ctx, generated_md)
+        logger.info(f"简历生成完成，file_id: {ctx['file_id']}, 返回成功响应")
+        return jsonify(_result_payload(ctx, generated_md, has_pdf)), 200
 
     except Exception as e:
         logger.exception("调用 Qwen API / LaTeX 编译失败")
-        return jsonify({"success": False, "message": f"生成失败: {e}"}), 500
\ No newline at end of file
+        return jsonify({"success": False, "message": f"生成失败: {e}"}), 500
+
+
+@bp.get("/api/resume/status/<job_id>")
+def api_resume_status(job_id: str):
+    """查询 ?async=1 提交的生成任务；完成后返回与同步接口相同的响应体"""
+    from app.services.resume_jobs import get_job
+
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "任务不存在或已过期"}), 404
+
+    status = job["status"]
+    if status == "done":
+        result = job["result"]
+        ctx = {
+            "file_id": result["file_id"],
+            "resume_path": result["resume_path"],
+            "jd_path": result["jd_path"],
+            "warnings": result["warnings"],
+            "defer_pdf": result["defer_pdf"],
+        }
+        payload = _result_payload(ctx, result["generated_md"], result["has_pdf"])
+        return jsonify({**payload, "jobId": job_id, "status": status}), 200
+    if status == "failed":
+        return jsonify({
+            "success": False,
+            "jobId": job_id,
+            "status": status,
+            "message": f"生成失败: {job['error']}",
+        }), 200
+    return jsonify({"success": True, "jobId": job_id, "status": status}), 200
+
+
+@bp.get("/api/resume/pdf-status/<file_id>")
+def api_resume_pdf_status(file_id: str):
+    """查询 ?asyncPdf=1 时后台编译的 PDF：ready / pending / failed"""
+    from app.services.resume_jobs import get_job
+
+    # PDF 直接编译在输出目录中，编译过程中文件可能已存在但未写完：
+    # 任务仍在进行时一律返回 pending，只有任务完成（或已过期）且文件存在才算 ready
+    job = get_job(_pdf_job_id(file_id))
+    if job is None or job["status"] == "done":
+        upload_dir = Path(getattr(Config, "UPLOAD_DIR", getattr(Config, "OUTPUT_DIR", "uploads")))
+        if (upload_dir / f"{file_id}.pdf").is_file():
+            return jsonify({
+                "success": True,
+                "fileId": file_id,
+                "pdfStatus": "ready",
+                "downloadPdf": url_for("uploads.download_file", file_name=f"{file_id}.pdf", _external=True),
+            }), 200
+        return jsonify({"success": False, "message": "PDF 任务不存在或已过期"}), 404
+    if job["status"] == "failed":
+        return jsonify({
+            "success": False,
+            "fileId": file_id,
+            "pdfStatus": "failed",
+            "message": f"PDF generation failed: {job['error']}",
+        }), 200
+    return jsonify({"success": True, "fileId": file_id, "pdfStatus": "pending"}), 200
@@ -1,6 +1,9 @@
-import os
+import re
+from pathlib import Path
+
 from flask import Blueprint, jsonify, send_file
 from app.config import Config
+from app.services import file_registry
 
 bp = Blueprint("uploads", __name__)
 
@@ -18,26 +21,38 @@ def models():
         "message": "Using Qwen API"
     })
 
+# 未登记文件的查找目录：导入时解析一次并去重（项目根目录下的路径在前，兼容旧的相对路径）
+_APP_DIR = Path(__file__).resolve().parent.parent
+_BASE_DIR = _APP_DIR.parent if _APP_DIR.name == "app" else _APP_DIR
+_SEARCH_DIRS = tuple(dict.fromkeys(
+    d.resolve() for d in (
+        _BASE_DIR / Config.OUTPUT_DIR,
+        _BASE_DIR / Config.INTERVIEW_REPORT_DIR,
+        Path(Config.OUTPUT_DIR),
+        Path(Config.INTERVIEW_REPORT_DIR),
+    )
+))
+
+
+# 生成的文件名只含字母数字与 . _ -，且不以 . 开头（排除 ..、隐藏文件与路径分隔符）
+_FILE_NAME_RE = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9._-]*')
+
+
 @bp.get("/api/files/<file_name>")
 def download_file(file_name: str):
-    from pathlib import Path
-    
-    # 获取项目根目录（app 目录的父目录）
-    app_dir = Path(__file__).parent.parent
-    base_dir = app_dir.parent if app_dir.name == "app" else app_dir
-    
-    # 构建绝对路径
-    candidates = [
-        base_dir / Config.OUTPUT_DIR / file_name,
-        base_dir / Config.INTERVIEW_REPORT_DIR / file_name,
-        # 兼容旧路径
-        Path(Config.OUTPUT_DIR) / file_name,
-        Path(Config.INTERVIEW_REPORT_DIR) / file_name,
-    ]
-    
-    for path in candidates:
-        path_abs = path.resolve() if isinstance(path, Path) else Path(path).resolve()
+    # 非法文件名直接拒绝，不做任何文件系统查找
+    if not _FILE_NAME_RE.fullmatch(file_name):
+        return jsonify({"success": False, "message": f"invalid file name: {file_name}"}), 400
+
+    # 生成时登记过的文件直接查表；conditional=True 让 HEAD / If-Modified-Since / Range
+    # 由 send_file 按文件元数据返回 304 / 206，不必读取整个文件
+    path = file_registry.lookup(file_name)
+    if path is not None:
+        return send_file(str(path), as_attachment=True, download_name=file_name, conditional=True)
+
+    for directory in _SEARCH_DIRS:
+        path_abs = directory / file_name
         if path_abs.is_file():
-            return send_file(str(path_abs), as_attachment=True, download_name=file_name)
+            return send_file(str(path_abs), as_attachment=True, download_name=file_name, conditional=True)
     
-    return jsonify({"success": False, "message": f"file not found: {file_name}"}), 404
\ No newline at end of file
+    return jsonify({"success": False, "message": f"file not found: {file_name}"}), 404
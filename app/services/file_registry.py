@@ -0,0 +1,41 @@
+# app/services/file_registry.py
+"""
+生成文件登记表：文件名 -> 绝对路径。
+
+简历 / PPT 生成后登记输出文件，下载接口按文件名直接查表，只需一次 stat 确认文件仍在；
+未登记的文件（如进程重启前生成的）由下载接口回退到按目录查找。
+登记表只存在于当前进程内，按最近登记顺序保留有限条目。
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+_MAX_ENTRIES = int(os.environ.get("FILE_REGISTRY_SIZE", "10000"))
+
+_REGISTRY: "OrderedDict[str, Path]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def register(path: Union[str, Path]) -> None:
+    """以文件名为键登记一个已生成的文件"""
+    abs_path = Path(path).resolve()
+    with _LOCK:
+        _REGISTRY[abs_path.name] = abs_path
+        _REGISTRY.move_to_end(abs_path.name)
+        while len(_REGISTRY) > _MAX_ENTRIES:
+            _REGISTRY.popitem(last=False)
+
+
+def lookup(file_name: str) -> Optional[Path]:
+    """返回已登记且仍存在的文件路径；未登记或文件已被删除返回 None"""
+    with _LOCK:
+        path = _REGISTRY.get(file_name)
+    if path is None:
+        return None
+    if path.is_file():
+        return path
+    with _LOCK:
+        _REGISTRY.pop(file_name, None)
+    return None
@@ -1,152 +1,559 @@
+import codecs
+import hashlib
+import io
+import logging
+import mmap
+import multiprocessing
 import os
-import uuid
+import threading
+import time
 import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Tuple, Optional, List
+from functools import lru_cache
+from typing import Iterator, Tuple, Optional, List, Union
 from werkzeug.utils import secure_filename
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import mm
-
 from app.config import Config
 
+logger = logging.getLogger(__name__)
+
+# 上传 / 输出目录是否已创建：每个进程只需创建一次，之后各请求中的调用直接返回
+_DIRS_READY = False
+
+
 def ensure_dirs():
-    os.makedirs(Config.RESUME_DIR, exist_ok=True)
-    os.makedirs(Config.JD_DIR, exist_ok=True)
-    os.makedirs(Config.OUTPUT_DIR, exist_ok=True)
-    os.makedirs(Config.INTERVIEW_AUDIO_DIR, exist_ok=True)
-    os.makedirs(Config.INTERVIEW_REPORT_DIR, exist_ok=True)
+    global _DIRS_READY
+    if _DIRS_READY:
+        return
+    # 都是叶子目录，公共祖先（UPLOAD_ROOT、interview/）随 makedirs 一并创建
+    for path in (Config.RESUME_DIR, Config.JD_DIR, Config.OUTPUT_DIR,
+                 Config.INTERVIEW_AUDIO_DIR, Config.INTERVIEW_REPORT_DIR):
+        os.makedirs(path, exist_ok=True)
+    _DIRS_READY = True
 
 def ext_ok(filename: str) -> bool:
-    _, ext = os.path.splitext((filename or "").lower())
-    return ext in Config.ALLOWED_EXTS
+    return os.path.splitext(filename or "")[1].lower() in Config.ALLOWED_EXTS
+
 
+# 文件内容：小文件整体读入为 bytes，大文件以只读 mmap 映射（见 read_text_from_file）
+_FileData = Union[bytes, mmap.mmap]
 
-def _detect_file_type(path: str) -> Optional[str]:
+# 判断纯文本时检查的开头字节数
+_TEXT_PROBE_BYTES = 512
+# 不小于该大小的文件用 mmap 映射，解析器按需从页缓存读取，不在堆上复制整份文件
+_MMAP_MIN_BYTES = 1 << 20
+
+
+def _parser_source(path: str, data: _FileData):
+    """
+    给接受路径或文件对象的解析器（zipfile / PyPDF2 / python-docx）使用。
+    mmap 没有 seekable()，zipfile 无法直接读取，大文件交给解析器按路径自行打开。
     """
-    通过文件头检测文件类型
+    if isinstance(data, mmap.mmap):
+        return path
+    return io.BytesIO(data)
+
+
+def _detect_file_type(data: _FileData) -> Optional[str]:
+    """
+    通过文件头检测文件类型（data 为已读入的文件内容，不再重新打开文件）
     返回文件扩展名（如 '.pdf', '.docx', '.txt'）或 None
     """
-    try:
-        with open(path, "rb") as f:
-            header = f.read(8)
-        
-        # PDF文件: %PDF
-        if header.startswith(b'%PDF'):
-            return ".pdf"
-        
-        # DOCX/DOCM文件: ZIP格式，PK\x03\x04
-        if header.startswith(b'PK\x03\x04'):
-            # 检查是否是docx（检查内部结构）
-            try:
-                with zipfile.ZipFile(path, 'r') as zip_ref:
-                    namelist = zip_ref.namelist()
-                    if '[Content_Types].xml' in namelist:
-                        return ".docx"
-            except:
-                pass
-            return ".docx"  # 默认认为是docx
-        
-        # 纯文本文件：尝试UTF-8解码
-        try:
-            with open(path, "r", encoding="utf-8", errors="strict") as f:
-                f.read(1024)  # 尝试读取前1KB
-            return ".txt"
-        except UnicodeDecodeError:
-            pass
-        
+    head = data[:_TEXT_PROBE_BYTES]
+
+    # PDF文件: %PDF
+    if head.startswith(b'%PDF'):
+        return ".pdf"
+
+    # DOCX/DOCM文件: ZIP格式，PK\x03\x04（其他 ZIP 也按 docx 尝试解析）
+    if head.startswith(b'PK\x03\x04'):
+        return ".docx"
+
+    # 纯文本文件：开头一段不含 NUL（二进制文件在这里直接排除），
+    # 且能按 UTF-8 严格解码（末尾被截断的多字节字符不算错误）
+    if b'\x00' in head:
         return None
-    except Exception:
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return ".txt"
+    except UnicodeDecodeError:
         return None
 
-def save_file(file_storage, target_dir: str) -> str:
+
+# 落盘时的拷贝块大小：1MB 一块，10MB 上传只需约 10 次 read/write
+_COPY_BUFSIZE = 1 << 20
+
+
+def _target_path(file_storage, target_dir: str) -> Tuple[str, str]:
+    """按上传文件名的扩展名生成随机落盘路径，返回 (path, ext)"""
     original = secure_filename(file_storage.filename or "")
     _, ext = os.path.splitext(original)
     if not ext:
         ext = ".txt"
-    name = f"{uuid.uuid4().hex}{ext}"
-    path = os.path.join(target_dir, name)
-    file_storage.save(path)
+    # 与 uuid4().hex 同为 32 位随机十六进制，省去构造 UUID 对象
+    name = f"{os.urandom(16).hex()}{ext}"
+    return os.path.join(target_dir, name), ext
+
+
+# 单个上传文件的大小上限，与请求体上限一致
+_MAX_UPLOAD_BYTES = Config.MAX_CONTENT_LENGTH
+
+
+class UploadTooLarge(ValueError):
+    """单个上传文件超过大小上限（路由据此返回 413）"""
+
+
+def _upload_too_large() -> UploadTooLarge:
+    return UploadTooLarge(f"上传文件过大，不能超过 {Config.MAX_MB}MB")
+
+
+def copy_upload(file_storage, path: str) -> None:
+    """
+    直接从上传流按大块拷贝到目标文件，不经过 FileStorage.save 的默认 16KB 缓冲。
+    超过大小上限时删除已写入的部分并抛出 UploadTooLarge（声明了长度的分段在写入前即拒绝）；
+    客户端断开等其他读写异常同样删除半截文件后原样抛出。
+    """
+    declared = file_storage.content_length
+    if declared and declared > _MAX_UPLOAD_BYTES:
+        raise _upload_too_large()
+    src = file_storage.stream
+    written = 0
+    try:
+        with open(path, "wb") as dst:
+            while chunk := src.read(_COPY_BUFSIZE):
+                written += len(chunk)
+                if written > _MAX_UPLOAD_BYTES:
+                    raise _upload_too_large()
+                dst.write(chunk)
+    except Exception:
+        _remove_quietly(path)
+        raise
+
+
+def save_file(file_storage, target_dir: str) -> str:
+    path, _ = _target_path(file_storage, target_dir)
+    copy_upload(file_storage, path)
     return os.path.abspath(path)
 
-def read_text_from_file(path: str) -> Tuple[str, Optional[str]]:
-    _, ext = os.path.splitext(path.lower())
-    warn = None
+
+def read_and_save(file_storage, target_dir: str) -> Tuple[str, str, Optional[str]]:
+    """
+    保存上传文件并读取文本，返回 (path, text, warn)；文件超过大小上限时抛出 UploadTooLarge。
+    .txt 只读一次上传流：同一份字节既落盘又直接解码，不再从磁盘读回；
+    .pdf/.docx 仍需先落盘再解析。
+    """
+    path, ext = _target_path(file_storage, target_dir)
+    if ext.lower() != ".txt":
+        copy_upload(file_storage, path)
+        path = os.path.abspath(path)
+        text, warn = read_text_from_file(path)
+        return path, text, warn
+
+    # 多读 1 字节即可判断是否超限，超限时不落盘
+    raw = file_storage.stream.read(_MAX_UPLOAD_BYTES + 1)
+    if len(raw) > _MAX_UPLOAD_BYTES:
+        raise _upload_too_large()
+    with open(path, "wb") as dst:
+        dst.write(raw)
+    path = os.path.abspath(path)
+    # 扩展名是 .txt 但内容其实是 PDF/DOCX：交给通用解析逻辑处理
+    if raw.startswith((b"%PDF", b"PK\x03\x04")):
+        text, warn = read_text_from_file(path, raw)
+        return path, text, warn
+    return path, raw.decode("utf-8", errors="ignore"), None
+
+
+# 上传文件落盘 + 解析的共享线程池：同一请求中的两份文件（简历 / JD）并行处理，
+# PDF/DOCX 解析与磁盘 I/O 时间相互重叠
+_READ_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="upload-read")
+
+
+def read_and_save_async(file_storage, target_dir: str) -> "Future[Tuple[str, str, Optional[str]]]":
+    """
+    在共享线程池中执行 read_and_save，返回 Future。
+    调用方在返回响应前必须等它结束（result() 或 discard_async_upload）：
+    请求结束后 Werkzeug 会关闭上传流，仍在读取的线程会在已关闭的文件上失败。
+    """
+    return _READ_POOL.submit(read_and_save, file_storage, target_dir)
+
+
+def discard_async_upload(future: "Future[Tuple[str, str, Optional[str]]]") -> None:
+    """
+    同一请求中另一份文件处理失败时调用：取消尚未开始的读取，或等待其结束后删除已落盘的文件。
+    后台读取自身的异常忽略（调用方正在抛出的异常更重要）。
+    """
+    if future.cancel():
+        return
     try:
-        # 检测文件实际类型（通过文件头）
-        file_type = _detect_file_type(path)
-        if file_type:
-            ext = file_type
-            if file_type != os.path.splitext(path.lower())[1]:
-                warn = f"文件扩展名与实际类型不匹配，已按{file_type}格式读取"
-        
-        if ext == ".txt":
-            # 检测到的文件类型已经处理过了，如果是docx会在这里被重新分配
-            # 真正的文本文件
-            with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read(), warn
-        elif ext == ".pdf":
-            try:
-                import PyPDF2
-                text = []
-                with open(path, "rb") as f:
-                    reader = PyPDF2.PdfReader(f)
-                    for page in reader.pages:
-                        text.append(page.extract_text() or "")
-                return "\n".join(text), None
-            except Exception as e:
-                warn = f"PDF解析失败：{e}"
-                return "", warn
-        elif ext == ".docx":
-            try:
-                from docx import Document
-            except Exception:
-                warn = ("未安装或错误安装了 python-docx。"
-                        "请执行：pip uninstall -y docx && pip install -U python-docx")
-                return "", warn
+        path, _, _ = future.result()
+    except Exception:
+        return
+    _remove_quietly(path)
+
+
+# 多页 PDF 按页段分给子进程并行提取（PyMuPDF 提取是 CPU 密集型，线程受 GIL 限制）。
+# 页数不超过阈值时直接在当前进程提取，避免进程间传输的开销
+_PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "3"))
+_PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(min(os.cpu_count() or 1, 4))))
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    """按需创建 PDF 提取进程池；用 spawn 启动，避免在多线程的 Web 进程里 fork"""
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        with _PDF_POOL_LOCK:
+            if _PDF_POOL is None:
+                _PDF_POOL = ProcessPoolExecutor(
+                    max_workers=_PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _PDF_POOL
+
+
+def _reset_pdf_pool(broken: ProcessPoolExecutor) -> None:
+    """子进程异常退出后进程池不可再用：丢弃它，下次提取时重新创建"""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is broken:
+            _PDF_POOL = None
+    broken.shutdown(wait=False)
+
+
+def _extract_pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    """用 PyMuPDF 提取 [start, stop) 页的文本（在子进程中执行，自行打开文件）"""
+    import fitz
+    with fitz.open(path) as doc:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+
+
+def _extract_pdf_text(path: str, data: _FileData) -> str:
+    """
+    逐页提取 PDF 文本（data 为文件内容，path 供并行提取的子进程打开）。
+    优先用 PyMuPDF（C 实现，比纯 Python 的 PyPDF2 快约一个数量级），页数较多时按页段并行；
+    未安装或解析出错时回退到 PyPDF2，PyPDF2 的异常交给调用方处理。
+    """
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+    if fitz is not None:
+        try:
+            # 大文件（mmap）直接让 MuPDF 按路径读取，小文件从内存中的字节打开
+            if isinstance(data, mmap.mmap):
+                doc = fitz.open(path, filetype="pdf")
+            else:
+                doc = fitz.open(stream=data, filetype="pdf")
+            with doc:
+                n_pages = doc.page_count
+                if n_pages < _PDF_PARALLEL_MIN_PAGES or _PDF_WORKERS <= 1:
+                    return "\n".join(page.get_text("text") for page in doc)
+            step = -(-n_pages // min(_PDF_WORKERS, n_pages))
+            pool = _pdf_pool()
             try:
-                doc = Document(path)
-                text = "\n".join(p.text for p in doc.paragraphs)
-                return text, None
-            except Exception as e:
-                warn = f"DOCX解析失败：{e}"
-                return "", warn
-        else:
-            return "", f"不支持的扩展名: {ext}"
+                futures = [
+                    pool.submit(_extract_pdf_pages, path, start, min(start + step, n_pages))
+                    for start in range(0, n_pages, step)
+                ]
+                return "\n".join(text for fut in futures for text in fut.result())
+            except BrokenProcessPool:
+                _reset_pdf_pool(pool)
+                raise
+        except Exception:
+            logger.warning(f"PyMuPDF 提取失败，回退到 PyPDF2: {path}", exc_info=True)
+
+    import PyPDF2
+    text = []
+    reader = PyPDF2.PdfReader(_parser_source(path, data))
+    for page in reader.pages:
+        text.append(page.extract_text() or "")
+    return "\n".join(text)
+
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = _W_NS + "p"
+# 段落内参与拼接的元素：文本、制表符、换行（与 python-docx 的 Paragraph.text 对应）
+_W_TEXT_TAGS = (_W_NS + "t", _W_NS + "tab", _W_NS + "br", _W_NS + "cr")
+_W_TEXT_SUBST = {_W_NS + "tab": "\t", _W_NS + "br": "\n", _W_NS + "cr": "\n"}
+
+
+def _paragraph_text(p) -> str:
+    """w:p 元素的纯文本：直接遍历 lxml 元素，不构建 python-docx 的 Run 对象"""
+    return "".join(
+        _W_TEXT_SUBST.get(el.tag) or el.text or ""
+        for el in p.iter(*_W_TEXT_TAGS)
+    )
+
+
+def _extract_docx_text(path: str, data: _FileData) -> Optional[str]:
+    """
+    直接从 ZIP 中流式解析 word/document.xml 取段落文本，不构建 python-docx 的对象模型。
+    每个段落处理完即 clear() 释放；lxml 不可用、解析失败或没有任何段落时返回 None，
+    由调用方回退到 python-docx。
+    """
+    try:
+        from lxml import etree
+    except ImportError:
+        return None
+    paragraphs = []
+    try:
+        with zipfile.ZipFile(_parser_source(path, data)) as zf, zf.open("word/document.xml") as xml:
+            for _, p in etree.iterparse(xml, tag=_W_P):
+                paragraphs.append(_paragraph_text(p))
+                p.clear()
+    except Exception:
+        return None
+    return "\n".join(paragraphs) if paragraphs else None
+
+
+def _parse_document(path: str, data: _FileData, ext: str) -> Tuple[str, Optional[str]]:
+    """解析 PDF / DOCX 正文（data 为文件内容），返回 (text, warn)；warn 非空表示解析失败"""
+    if ext == ".pdf":
+        try:
+            return _extract_pdf_text(path, data), None
+        except Exception as e:
+            return "", f"PDF解析失败：{e}"
+
+    text = _extract_docx_text(path, data)
+    if text is not None:
+        return text, None
+    try:
+        from docx import Document
+    except Exception:
+        return "", ("未安装或错误安装了 python-docx。"
+                    "请执行：pip uninstall -y docx && pip install -U python-docx")
+    try:
+        doc = Document(_parser_source(path, data))
+        # 与 _extract_docx_text 相同的段落集合（body 下所有 w:p，含表格单元格内的段落）
+        body = doc.element.body
+        return "\n".join(_paragraph_text(p) for p in body.iter(_W_P)), None
+    except Exception as e:
+        return "", f"DOCX解析失败：{e}"
+
+
+# ===== 解析结果缓存 =====
+# 用户常重复上传同一份简历：按文件内容的哈希缓存 PDF/DOCX 的解析结果。
+# 进程内 LRU 之外，同时落盘到 CACHE_DIR/text，供其他 worker 与重启后的进程复用。
+# 落盘的是简历 / JD 原文：超过 TTL 的文件删除，且只保留最近使用的 TEXT_CACHE_SIZE 个
+_TEXT_CACHE_MAX = int(os.environ.get("TEXT_CACHE_SIZE", "256"))
+_TEXT_CACHE_TTL = float(os.environ.get("TEXT_CACHE_TTL", str(7 * 24 * 3600)))
+_TEXT_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_TEXT_CACHE_LOCK = threading.Lock()
+
+
+def _content_key(data: _FileData, ext: str) -> str:
+    """文件内容的 blake2b 摘要 + 实际类型，作为解析缓存的键"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest() + ext
+
+
+def _text_cache_file(key: str) -> str:
+    return os.path.join(Config.CACHE_DIR, "text", key + ".txt")
+
+
+def _text_cache_get(key: str) -> Optional[str]:
+    with _TEXT_CACHE_LOCK:
+        text = _TEXT_CACHE.get(key)
+        if text is not None:
+            _TEXT_CACHE.move_to_end(key)
+            return text
+    path = _text_cache_file(key)
+    try:
+        with open(path, "rb") as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime > _TEXT_CACHE_TTL:
+                return None
+            text = f.read().decode("utf-8")
+        # 命中时刷新修改时间，清理时按最近使用保留
+        os.utime(path)
+    except (OSError, UnicodeDecodeError):
+        return None
+    _text_cache_remember(key, text)
+    return text
+
+
+def _text_cache_remember(key: str, text: str) -> None:
+    with _TEXT_CACHE_LOCK:
+        _TEXT_CACHE[key] = text
+        _TEXT_CACHE.move_to_end(key)
+        while len(_TEXT_CACHE) > _TEXT_CACHE_MAX:
+            _TEXT_CACHE.popitem(last=False)
+
+
+def _text_cache_put(key: str, text: str) -> None:
+    """写入进程内缓存并落盘；落盘失败不影响本次结果"""
+    _text_cache_remember(key, text)
+    path = _text_cache_file(key)
+    tmp = f"{path}.{os.urandom(8).hex()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(text.encode("utf-8"))
+        # 先写临时文件再原子替换，并发进程不会读到半截内容
+        os.replace(tmp, path)
+    except OSError:
+        _remove_quietly(tmp)
+        return
+    _prune_text_cache_dir(os.path.dirname(path))
+
+
+def _prune_text_cache_dir(directory: str) -> None:
+    """
+    删除超过 TTL 的缓存文件（含异常残留的临时文件），其余按修改时间只保留最近的 _TEXT_CACHE_MAX 个。
+    只在缓存未命中、新写入解析结果后调用，相比解析本身开销可忽略。
+    """
+    now = time.time()
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if now - mtime > _TEXT_CACHE_TTL:
+                    _remove_quietly(entry.path)
+                elif entry.name.endswith(".txt"):
+                    entries.append((mtime, entry.path))
+    except OSError:
+        return
+    if len(entries) > _TEXT_CACHE_MAX:
+        entries.sort(reverse=True)
+        for _, stale in entries[_TEXT_CACHE_MAX:]:
+            _remove_quietly(stale)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def read_text_from_file(path: str, data: Optional[bytes] = None) -> Tuple[str, Optional[str]]:
+    """
+    读取文件文本，返回 (text, warn)。
+    文件只读入一次：类型检测、缓存摘要与解析共用同一份内容；调用方已持有内容时可直接传入 data。
+    大文件改用只读 mmap，不把整份文件复制进进程堆内存。
+    """
+    try:
+        if data is not None:
+            return _read_text(path, data)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+                return _read_text(path, f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _read_text(path, mm)
     except Exception as e:
         return "", f"读取失败：{e}"
 
+
+def _read_text(path: str, data: _FileData) -> Tuple[str, Optional[str]]:
+    # 只对扩展名部分转小写，不必复制整条路径
+    orig_ext = ext = os.path.splitext(path)[1].lower()
+    warn = None
+    # 检测文件实际类型（通过文件头）
+    file_type = _detect_file_type(data)
+    if file_type:
+        ext = file_type
+        if file_type != orig_ext:
+            warn = f"文件扩展名与实际类型不匹配，已按{file_type}格式读取"
+
+    if ext == ".txt":
+        # 检测到的文件类型已经处理过了，如果是docx会在这里被重新分配
+        # 真正的文本文件：整体解码（data[:] 对 bytes 不复制，对 mmap 取出全部内容）
+        return data[:].decode("utf-8", errors="ignore"), warn
+    elif ext in (".pdf", ".docx"):
+        key = _content_key(data, ext)
+        text = _text_cache_get(key)
+        if text is not None:
+            return text, None
+        text, warn = _parse_document(path, data, ext)
+        if warn is None:
+            _text_cache_put(key, text)
+        return text, warn
+    else:
+        return "", f"不支持的扩展名: {ext}"
+
 def truncate_text(s: str, max_chars: int) -> Tuple[str, Optional[str]]:
     if len(s) <= max_chars:
         return s, None
     return s[:max_chars] + f"\n\n...[Truncated to {max_chars} chars]", f"输入文本过长，已截断至 {max_chars} 字符。"
 
+
+# 正文按约 2000 字符拆成多个 Preformatted，排版时逐块处理，不必一次布局整篇文本
+_PDF_CHUNK_CHARS = 2000
+
+
+# reportlab 冷导入需数百毫秒：只在首次生成 PDF 时导入，只解析上传文件的进程不加载
+@lru_cache(maxsize=1)
+def _pdf_styles():
+    """样式表构建开销不小，进程内只构建一次（只读使用）"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=1)
+def _doc_kwargs():
+    """页面尺寸与页边距（各次生成相同）"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    return dict(pagesize=A4,
+                leftMargin=18*mm, rightMargin=18*mm,
+                topMargin=14*mm, bottomMargin=16*mm)
+
+
+def _preformatted_chunks(text: str, limit: int = _PDF_CHUNK_CHARS) -> Iterator[str]:
+    """
+    在行边界处切块。只在前后两行都非空处切开：Preformatted 会裁掉块首尾的空行，
+    这样切分后的排版与整篇放进一个 Preformatted 完全一致。
+    """
+    buf: List[str] = []
+    size = 0
+    for line in text.split("\n"):
+        if size >= limit and line.strip() and buf[-1].strip():
+            yield "\n".join(buf)
+            buf, size = [], 0
+        buf.append(line)
+        size += len(line) + 1
+    if buf:
+        yield "\n".join(buf)
+
+
 def write_pdf_from_markdown(md_text: str, pdf_path: str, title: str = "Customized Resume"):
-    styles = getSampleStyleSheet()
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
+
+    styles = _pdf_styles()
     story: List = []
     cover_title = Paragraph(f"<b>{title}</b>", styles["Title"])
-    from datetime import datetime as _dt
-    cover_date = Paragraph(_dt.now().strftime("%Y-%m-%d %H:%M"), styles["Normal"])
+    cover_date = Paragraph(datetime.now().strftime("%Y-%m-%d %H:%M"), styles["Normal"])
     story.extend([Spacer(1, 30*mm), cover_title, Spacer(1, 5*mm), cover_date, Spacer(1, 20*mm)])
-    body = Preformatted(md_text, styles["Code"])
-    story.extend([body])
+    code_style = styles["Code"]
+    story.extend(Preformatted(chunk, code_style) for chunk in _preformatted_chunks(md_text))
 
-    doc = SimpleDocTemplate(pdf_path, pagesize=A4,
-                            leftMargin=18*mm, rightMargin=18*mm,
-                            topMargin=14*mm, bottomMargin=16*mm)
+    doc = SimpleDocTemplate(pdf_path, **_doc_kwargs())
     doc.build(story)
 
+
+_WRITE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="output-write")
+
+
+def _write_text(path: str, content: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
 def write_outputs(md_content: str):
     ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    import uuid as _uuid
-    file_id = f"{ts}-{_uuid.uuid4().hex}"
-
-    md_path = os.path.join(Config.OUTPUT_DIR, file_id + ".md")
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(md_content)
+    file_id = f"{ts}-{os.urandom(16).hex()}"
 
-    pdf_path = os.path.join(Config.OUTPUT_DIR, file_id + ".pdf")
+    base = os.path.join(Config.OUTPUT_DIR, file_id)
+    md_path, pdf_path = base + ".md", base + ".pdf"
+    # .md 落盘（I/O）交给线程池，与当前线程中的 PDF 排版（CPU）重叠
+    md_future = _WRITE_POOL.submit(_write_text, md_path, md_content)
     write_pdf_from_markdown(md_content, pdf_path, title="Job-Tailored Resume")
+    md_future.result()
     return md_path, pdf_path, file_id
\ No newline at end of file
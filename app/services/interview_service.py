@@ -4,22 +4,28 @@ import hmac
 import json
 import logging
 import os
+import re
 import shutil
 import subprocess
 import threading
 import time
 import tempfile
 import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import quote
 
+try:  # 可选依赖：未安装 orjson 时用标准库 json（orjson 的解析错误同样是 json.JSONDecodeError 子类）
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
-import websocket
 from ..config import Config
-from .files import ensure_dirs
+from .files import copy_upload, ensure_dirs
 from .prompts import build_questions_prompt
 
 logger = logging.getLogger(__name__)
@@ -28,14 +34,14 @@ logger = logging.getLogger(__name__)
 DEFAULT_QUESTION_DURATION = int(os.environ.get("INTERVIEW_QUESTION_DURATION", "180"))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class InterviewQuestion:
     id: str
     text: str
     duration_seconds: int = DEFAULT_QUESTION_DURATION
 
 
-@dataclass
+@dataclass(slots=True)
 class AnswerRecord:
     question_id: str
     question_text: str
@@ -46,7 +52,7 @@ class AnswerRecord:
     warnings: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class InterviewSession:
     session_id: str
     questions: List[InterviewQuestion]
@@ -55,27 +61,75 @@ class InterviewSession:
     question_started_at: Optional[float] = field(default_factory=time.time)
     answers: Dict[str, AnswerRecord] = field(default_factory=dict)
     info: Dict[str, object] = field(default_factory=dict)
+    last_active_at: float = field(default_factory=time.time)
 
 
-_SESSIONS: Dict[str, InterviewSession] = {}
+# 会话按最近访问顺序保存：超过 TTL 未访问或超出容量的会话会被淘汰，避免放弃的面试常驻内存
+_MAX_SESSIONS = int(os.environ.get("INTERVIEW_MAX_SESSIONS", "10000"))
+_SESSION_TTL = float(os.environ.get("INTERVIEW_SESSION_TTL", "14400"))
+_SESSIONS: "OrderedDict[str, InterviewSession]" = OrderedDict()
+# 只保护 _SESSIONS 的整体操作（新增 / 查找 / 淘汰 / 清空）
 _LOCK = threading.RLock()
+# 会话状态按 session_id 分片加锁：不同面试的提交互不阻塞，且锁内不做磁盘 / 网络 I/O
+_LOCK_SHARD_COUNT = 16
+_LOCK_SHARDS = tuple(threading.RLock() for _ in range(_LOCK_SHARD_COUNT))
+
+
+def _lock_for(session_id: str):
+    return _LOCK_SHARDS[hash(session_id) & (_LOCK_SHARD_COUNT - 1)]
+
+
+def _evict_sessions(now: float) -> None:
+    """淘汰过期及超出容量的会话，调用方需持有 _LOCK"""
+    while _SESSIONS:
+        session_id, oldest = next(iter(_SESSIONS.items()))
+        if len(_SESSIONS) <= _MAX_SESSIONS and now - oldest.last_active_at <= _SESSION_TTL:
+            break
+        del _SESSIONS[session_id]
+
+
+def _store_session(session: InterviewSession) -> None:
+    """登记 / 刷新会话的最近访问时间"""
+    now = time.time()
+    with _LOCK:
+        session.last_active_at = now
+        _SESSIONS[session.session_id] = session
+        _SESSIONS.move_to_end(session.session_id)
+        _evict_sessions(now)
+
+
+def _lookup_session(session_id: str) -> InterviewSession:
+    """查找会话并刷新其 TTL；不存在或已过期抛出 KeyError"""
+    now = time.time()
+    with _LOCK:
+        _evict_sessions(now)
+        session = _SESSIONS.get(session_id)
+        if not session:
+            raise KeyError("会话不存在或已过期")
+        session.last_active_at = now
+        _SESSIONS.move_to_end(session_id)
+        return session
+
+
+_PRESET_QUESTIONS = (
+    "请介绍一下你在上一份工作中最具挑战性的项目，以及你在其中扮演的角色。",
+    "面对紧迫的截止日期时，你是如何平衡质量与速度的？请举例说明。",
+    "描述一次你与跨职能团队合作的经历，你们如何解决分歧？",
+    "如果加入我们团队，你认为自己可以在哪些方面带来独特价值？",
+    "请分享一次你主动学习新技能并成功应用到工作的案例。",
+)
+# 问题对象不可变，导入时构建一次，各会话共享同一批实例
+_DEFAULT_QUESTIONS: Tuple[InterviewQuestion, ...] = tuple(
+    InterviewQuestion(id=f"q{i+1}", text=question)
+    for i, question in enumerate(_PRESET_QUESTIONS)
+)
 
 
 def _default_questions() -> List[InterviewQuestion]:
     """
     默认固定问题列表（作为备选方案，当无法生成问题时使用）
     """
-    preset = [
-        "请介绍一下你在上一份工作中最具挑战性的项目，以及你在其中扮演的角色。",
-        "面对紧迫的截止日期时，你是如何平衡质量与速度的？请举例说明。",
-        "描述一次你与跨职能团队合作的经历，你们如何解决分歧？",
-        "如果加入我们团队，你认为自己可以在哪些方面带来独特价值？",
-        "请分享一次你主动学习新技能并成功应用到工作的案例。",
-    ]
-    return [
-        InterviewQuestion(id=f"q{i+1}", text=question)
-        for i, question in enumerate(preset)
-    ]
+    return list(_DEFAULT_QUESTIONS)
 
 
 def _generate_questions_from_jd(job_description_text: Optional[str]) -> Tuple[List[InterviewQuestion], List[str]]:
@@ -273,26 +327,31 @@ def _save_audio_file(session_id: str, question_id: str, file_storage: FileStorag
         ext = ".webm"
     target_name = f"{session_id}-{question_id}-{uuid.uuid4().hex}{ext}"
     target_path = os.path.join(Config.INTERVIEW_AUDIO_DIR, target_name)
-    file_storage.save(target_path)
+    copy_upload(file_storage, target_path)
     return target_path
 
 
-def _convert_to_pcm16(audio_path: str) -> Tuple[Optional[Path], List[str]]:
+# ffmpeg stdout 管道的读缓冲（1MB）
+_PCM_PIPE_BUFSIZE = 1 << 20
+
+
+def _open_pcm16_stream(audio_path: str) -> Tuple[Optional[subprocess.Popen], List[str]]:
     """
-    Convert arbitrary audio file to 16kHz mono PCM using ffmpeg.
-    Returns path to temp file and any warnings.
+    Start ffmpeg converting arbitrary audio to 16kHz mono PCM on its stdout pipe,
+    so the PCM can be streamed straight to RTASR without a temp file.
+    Returns the process (None if ffmpeg is unavailable) and any warnings.
     """
     warnings: List[str] = []
-    ffmpeg_path = shutil.which("ffmpeg")  # type: ignore[name-defined]
+    ffmpeg_path = shutil.which("ffmpeg")
     if not ffmpeg_path:
         warnings.append("未找到 ffmpeg，可用 brew/apt 安装后再启用讯飞实时转写。")
         return None, warnings
 
-    tmp_fd, tmp_path = tempfile.mkstemp(suffix=".pcm")
-    os.close(tmp_fd)
     cmd = [
         ffmpeg_path,
-        "-y",
+        "-nostdin",
+        "-loglevel",
+        "error",
         "-i",
         audio_path,
         "-ac",
@@ -301,14 +360,43 @@ def _convert_to_pcm16(audio_path: str) -> Tuple[Optional[Path], List[str]]:
         "16000",
         "-f",
         "s16le",
-        tmp_path,
+        "pipe:1",
     ]
+    # stderr 写入匿名临时文件：错误输出再多也不会因管道写满而阻塞 ffmpeg
+    err_file = tempfile.TemporaryFile()
     try:
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return Path(tmp_path), warnings
-    except subprocess.CalledProcessError as exc:
-        warnings.append(f"ffmpeg 转换失败：{exc.stderr.decode('utf-8', errors='ignore')}")
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err_file, bufsize=_PCM_PIPE_BUFSIZE)
+    except OSError as exc:
+        err_file.close()
+        warnings.append(f"ffmpeg 启动失败：{exc}")
         return None, warnings
+    proc.err_file = err_file  # type: ignore[attr-defined]
+    return proc, warnings
+
+
+_PCM_CLOSE_LOCK = threading.Lock()
+
+
+def _close_pcm16_stream(proc: subprocess.Popen, kill: bool = False) -> Optional[str]:
+    """
+    Close the pipe and reap ffmpeg; kill=True stops it first (reader gave up early).
+    Safe to call more than once. Returns a warning message when the conversion failed.
+    """
+    with _PCM_CLOSE_LOCK:
+        err_file = proc.err_file  # type: ignore[attr-defined]
+        if err_file.closed:
+            return None
+        if kill and proc.poll() is None:
+            proc.kill()
+        returncode = proc.wait()
+        proc.stdout.close()
+        try:
+            if returncode != 0 and not kill:
+                err_file.seek(0)
+                return f"ffmpeg 转换失败：{err_file.read().decode('utf-8', errors='ignore')}"
+            return None
+        finally:
+            err_file.close()
 
 
 def _integrate_chunks_with_qwen(chunks: List[str], logger_instance: logging.Logger) -> Optional[str]:
@@ -423,7 +511,82 @@ def _integrate_chunks_with_qwen(chunks: List[str], logger_instance: logging.Logg
         return None
 
 
-def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) -> Tuple[str, List[str]]:
+# 讯飞转写专用 logger：消息只发一次，经它自己的文件处理器写入日志文件，
+# 再向上传递到应用日志（不必对 logger / xfyun_logger 各写一遍）
+_XFYUN_LOGGER = logging.getLogger(f"{__name__}.xfyun_rtasr")
+_XFYUN_LOG_LOCK = threading.Lock()
+_xfyun_log_day: Optional[str] = None
+_xfyun_file_handler: Optional[logging.FileHandler] = None
+
+
+def _get_xfyun_logger() -> logging.Logger:
+    """
+    日志文件按天切分（logs/xfyun/xfyun_rtasr_YYYYMMDD.log），文件处理器跨请求复用，
+    日期变化时才换新文件；不再为每次转写打开 / 关闭一个日志文件。
+    """
+    global _xfyun_log_day, _xfyun_file_handler
+    day = time.strftime("%Y%m%d")
+    if day == _xfyun_log_day:
+        return _XFYUN_LOGGER
+    with _XFYUN_LOG_LOCK:
+        if day != _xfyun_log_day:
+            xfyun_log_dir = os.path.join(Config.UPLOAD_ROOT, "logs", "xfyun")
+            os.makedirs(xfyun_log_dir, exist_ok=True)
+            xfyun_log_file = os.path.join(xfyun_log_dir, f"xfyun_rtasr_{day}.log")
+
+            file_handler = logging.FileHandler(xfyun_log_file, encoding='utf-8')
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+
+            if _xfyun_file_handler is not None:
+                _XFYUN_LOGGER.removeHandler(_xfyun_file_handler)
+                _xfyun_file_handler.close()
+            _XFYUN_LOGGER.addHandler(file_handler)
+            _XFYUN_LOGGER.setLevel(logging.DEBUG)
+            _xfyun_file_handler = file_handler
+            _xfyun_log_day = day
+    return _XFYUN_LOGGER
+
+
+# 非字母数字字符（汉字属于字母类，不在此列）；去掉后剩余长度即片段的有效字数
+_RE_NON_ALNUM = re.compile(r'[\W_]+')
+
+
+def _content_length(text: str) -> int:
+    """按中文字符和字母数字计算的长度（与 str.isalnum 逐字判断一致），由正则引擎一次完成"""
+    return len(_RE_NON_ALNUM.sub("", text))
+
+
+# RTASR 握手签名（ts + HMAC-SHA1）的复用时长：服务端只校验 ts 与当前时间的偏差，
+# 同一组凭证在该时长内的多次转写（一场面试的多道题）共用一次签名计算
+_RTASR_SIGNA_TTL = float(os.getenv("XFYUN_SIGNA_TTL", "240"))
+# (appid, api_key) -> (签名时刻, ts, 已 URL 编码的 signa)
+_RTASR_SIGNA_CACHE: Dict[Tuple[str, str], Tuple[float, str, str]] = {}
+_RTASR_SIGNA_LOCK = threading.Lock()
+
+
+def _rtasr_signature(appid: str, api_key: str) -> Tuple[str, str]:
+    """返回 (ts, signa)；在有效期内复用上次的签名"""
+    now = time.time()
+    key = (appid, api_key)
+    with _RTASR_SIGNA_LOCK:
+        cached = _RTASR_SIGNA_CACHE.get(key)
+        if cached is not None and now - cached[0] < _RTASR_SIGNA_TTL:
+            return cached[1], cached[2]
+    ts = str(int(now))
+    md5_hash = hashlib.md5((appid + ts).encode("utf-8")).hexdigest()
+    signa = hmac.new(api_key.encode("utf-8"), md5_hash.encode("utf-8"), hashlib.sha1).digest()
+    signa_b64 = quote(base64.b64encode(signa))
+    with _RTASR_SIGNA_LOCK:
+        _RTASR_SIGNA_CACHE[key] = (now, ts, signa_b64)
+    return ts, signa_b64
+
+
+def _transcribe_audio_rtasr(
+    audio_path: str,
+    return_all_chunks: bool = False,
+    on_preliminary: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, List[str]]:
     """
     调用讯飞实时语音转写 RTASR 服务。需配置：
     - XFYUN_APPID
@@ -433,6 +596,7 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
     Args:
         audio_path: 音频文件路径
         return_all_chunks: 如果为True，返回所有片段列表（第一个元素）和警告列表；如果为False，返回最终文本和警告列表
+        on_preliminary: 需要调用 Qwen 整合时，先以最长片段作为初步文本回调，调用方可借此与整合并行发起评估
     
     Returns:
         如果return_all_chunks=False: (最终文本, 警告列表)
@@ -458,38 +622,25 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
     
     logger.info(f"讯飞配置检查通过: APPID={appid}, API_KEY长度={len(api_key)}")
 
-    pcm_path, convert_warnings = _convert_to_pcm16(audio_path)
+    pcm_proc, convert_warnings = _open_pcm16_stream(audio_path)
     warnings.extend(convert_warnings)
-    if pcm_path is None:
+    if pcm_proc is None:
         return "", warnings
 
-    # 设置讯飞转写专用日志文件
-    xfyun_log_dir = os.path.join(Config.UPLOAD_ROOT, "logs", "xfyun")
-    os.makedirs(xfyun_log_dir, exist_ok=True)
-    xfyun_log_file = os.path.join(xfyun_log_dir, f"xfyun_rtasr_{int(time.time())}.log")
-    
-    # 创建文件日志处理器
-    file_handler = logging.FileHandler(xfyun_log_file, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-    file_handler.setFormatter(file_formatter)
-    
-    # 获取讯飞转写专用的logger
-    xfyun_logger = logging.getLogger(f"{__name__}.xfyun_rtasr")
-    xfyun_logger.addHandler(file_handler)
-    xfyun_logger.setLevel(logging.DEBUG)
-    xfyun_logger.info(f"讯飞实时转写日志文件: {xfyun_log_file}")
+    # 讯飞转写专用日志：同时写入按天分的日志文件，并照常传递到应用日志
+    xfyun_logger = _get_xfyun_logger()
 
     result_chunks: List[str] = []
     final_result: Optional[str] = None  # 存储最后一个完整结果（ls:true）
     event = threading.Event()
     error_occurred = False
+    # 已发送的 PCM 字节数：边转换边发送，音频时长只能按已发送量估算
+    sent_bytes = 0
 
     def _on_message(ws, message):  # type: ignore[no-redef]
         nonlocal error_occurred, final_result
         try:
-            payload = json.loads(message)
-            logger.info(f"讯飞实时转写收到消息: {payload}")
+            payload = _json_loads(message)
             xfyun_logger.info(f"讯飞实时转写收到消息: {payload}")
         except json.JSONDecodeError as e:
             error_msg = f"讯飞实时转写返回无法解析: {e}"
@@ -531,28 +682,25 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
             if data_str:
                 try:
                     # 解析data字段中的JSON字符串
-                    data_obj = json.loads(data_str)
+                    data_obj = _json_loads(data_str)
                     # 检查是否是最后一个完整结果（ls:true）
                     is_final = data_obj.get("ls", False)
                     
-                    # 提取识别文本：data.cn.st.rt[0].ws[].cw[].w
-                    text_parts = []
-                    cn = data_obj.get("cn", {})
-                    st = cn.get("st", {})
-                    rt = st.get("rt", [])
-                    for rt_item in rt:
-                        ws = rt_item.get("ws", [])
-                        for ws_item in ws:
-                            cw = ws_item.get("cw", [])
-                            for cw_item in cw:
-                                word = cw_item.get("w", "")
-                                if word:
-                                    text_parts.append(word)
-                    
-                    if text_parts:
-                        text = "".join(text_parts)
-                        result_chunks.append(text)
-                        logger.info(f"讯飞实时转写识别到文本: {text} (ls={is_final})")
+                    # 提取识别文本：data.cn.st.rt[0].ws[].cw[].w，一个生成器表达式内完成遍历与拼接
+                    text = "".join(
+                        cw_item.get("w") or ""
+                        for rt_item in data_obj.get("cn", {}).get("st", {}).get("rt", ())
+                        for ws_item in rt_item.get("ws", ())
+                        for cw_item in ws_item.get("cw", ())
+                    )
+
+                    if text:
+                        # 逐步识别的结果通常是上一片段的延长：直接替换上一片段，
+                        # 长回答不会累积 N 份逐渐变长的副本；不相接的新片段照常追加
+                        if result_chunks and text.startswith(result_chunks[-1]):
+                            result_chunks[-1] = text
+                        else:
+                            result_chunks.append(text)
                         xfyun_logger.info(f"讯飞实时转写识别到文本: {text} (ls={is_final})")
                         
                         # 如果是最后一个完整结果，保存它
@@ -609,44 +757,52 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
         event.set()
 
     def _on_open(ws):  # type: ignore[no-redef]
-        logger.info("讯飞实时转写 WebSocket 连接已打开，开始发送音频数据")
         xfyun_logger.info("讯飞实时转写 WebSocket 连接已打开，开始发送音频数据")
         def run():
+            nonlocal sent_bytes
             try:
-                pcm_file_size = os.path.getsize(pcm_path)
-                logger.info(f"开始发送音频文件，大小: {pcm_file_size} 字节")
-                xfyun_logger.info(f"开始发送音频文件，大小: {pcm_file_size} 字节")
-                
-                # 计算音频时长（PCM 16kHz 16bit mono = 32000 字节/秒）
-                audio_duration_seconds = pcm_file_size / 32000.0
-                xfyun_logger.info(f"估算音频时长: {audio_duration_seconds:.2f} 秒")
-                
+                xfyun_logger.info("开始发送音频数据（ffmpeg 管道实时转换）")
+
                 # 按照官方demo方式：直接发送二进制数据，不使用JSON格式
-                with open(pcm_path, "rb") as pcm_stream:
-                    frame_size = int(os.getenv("XFYUN_FRAME_SIZE", "1280"))
-                    chunk_count = 0
-                    send_interval = 0.04  # 40ms，与16kHz采样率匹配（1280字节=640采样点≈40ms）
-                    
-                    while True:
-                        chunk = pcm_stream.read(frame_size)
-                        if not chunk:
-                            break
-                        
-                        # 关键修复：直接发送二进制数据（按照官方demo）
-                        ws.send(chunk)
-                        chunk_count += 1
-                        time.sleep(send_interval)
-                    
-                    logger.info(f"音频数据发送完成，共发送 {chunk_count} 个数据块")
-                    xfyun_logger.info(f"音频数据发送完成，共发送 {chunk_count} 个数据块")
-                    
-                    # 发送结束标志（按照官方demo格式）
-                    end_tag = '{"end": true}'
-                    ws.send(end_tag.encode('utf-8'))
-                    logger.info("已发送结束标志 (end: true)")
-                    xfyun_logger.info("已发送结束标志 (end: true)")
-                    logger.info("等待服务器返回识别结果...")
-                    xfyun_logger.info("等待服务器返回识别结果...")
+                # PCM 直接从 ffmpeg 的 stdout 读取，不经过临时文件
+                pcm_stream = pcm_proc.stdout
+                frame_size = int(os.getenv("XFYUN_FRAME_SIZE", "1280"))
+                chunk_count = 0
+                # 发送节奏与实时音频一致：1280字节=640采样点≈40ms（16kHz 16bit mono = 32000 字节/秒）。
+                # 每帧的发送时刻按已发送字节数从起点推算，只睡到该时刻，sleep 误差不会逐帧累积；
+                # 落后于实时进度时把已到期的帧合并成一次发送（最多 4 帧），不超过实时速率
+                start = time.monotonic()
+
+                while True:
+                    delay = start + sent_bytes / 32000.0 - time.monotonic()
+                    if delay > 0.005:
+                        time.sleep(delay)
+                        frames_due = 1
+                    else:
+                        frames_due = min(4, 1 + int(-delay * 32000.0) // frame_size)
+                    chunk = pcm_stream.read(frame_size * frames_due)
+                    if not chunk:
+                        break
+
+                    # 关键修复：直接发送二进制数据（按照官方demo）
+                    ws.send(chunk)
+                    sent_bytes += len(chunk)
+                    chunk_count += 1
+
+                convert_error = _close_pcm16_stream(pcm_proc)
+                if convert_error:
+                    logger.warning(convert_error)
+                    warnings.append(convert_error)
+
+                # 计算音频时长（PCM 16kHz 16bit mono = 32000 字节/秒）
+                audio_duration_seconds = sent_bytes / 32000.0
+                xfyun_logger.info(f"音频数据发送完成，共发送 {chunk_count} 个数据块，{sent_bytes} 字节，音频时长: {audio_duration_seconds:.2f} 秒")
+
+                # 发送结束标志（按照官方demo格式）
+                end_tag = '{"end": true}'
+                ws.send(end_tag.encode('utf-8'))
+                xfyun_logger.info("已发送结束标志 (end: true)")
+                xfyun_logger.info("等待服务器返回识别结果...")
 
             except Exception as exc:
                 error_msg = f"发送音频失败：{exc}"
@@ -661,16 +817,10 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
         import websocket  # type: ignore
     except ImportError:
         warnings.append("缺少 websocket-client 库，请运行 pip install websocket-client")
-        try:
-            os.remove(pcm_path)
-        except OSError:
-            pass
+        _close_pcm16_stream(pcm_proc, kill=True)
         return "", warnings
 
-    ts = str(int(time.time()))
-    md5_hash = hashlib.md5((appid + ts).encode("utf-8")).hexdigest()
-    signa = hmac.new(api_key.encode("utf-8"), md5_hash.encode("utf-8"), hashlib.sha1).digest()
-    signa_b64 = quote(base64.b64encode(signa))
+    ts, signa_b64 = _rtasr_signature(appid, api_key)
 
     # 使用ws://而不是wss://（根据官方demo）
     url = f"ws://rtasr.xfyun.cn/v1/ws?appid={appid}&ts={ts}&signa={signa_b64}"
@@ -684,21 +834,19 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
         on_open=_on_open,
     )
 
-    # 根据音频文件大小动态计算超时时间
-    # PCM 16kHz 16bit mono = 32000 字节/秒
-    # 超时时间 = 音频时长 + 发送时间 + 处理时间（至少30秒缓冲）
-    pcm_file_size = os.path.getsize(pcm_path)
-    audio_duration_seconds = pcm_file_size / 32000.0
-    send_time_seconds = audio_duration_seconds * 1.1  # 发送时间约为音频时长的1.1倍
-    buffer_seconds = 30.0  # 处理缓冲时间
-    calculated_timeout = audio_duration_seconds + send_time_seconds + buffer_seconds
-    
-    # 使用环境变量配置的最小超时时间，或计算出的超时时间，取较大值
+    # 使用环境变量配置的最小超时时间
     min_timeout = float(os.getenv("XFYUN_TIMEOUT", "60"))
-    timeout_seconds = max(min_timeout, calculated_timeout)
-    
-    logger.info(f"开始连接讯飞实时转写，音频时长: {audio_duration_seconds:.2f}秒，超时时间: {timeout_seconds:.2f}秒")
-    xfyun_logger.info(f"开始连接讯飞实时转写，音频文件大小: {pcm_file_size} 字节，音频时长: {audio_duration_seconds:.2f}秒，超时时间: {timeout_seconds:.2f}秒")
+
+    def _timeout_seconds() -> float:
+        # 根据已发送的音频量动态计算超时时间
+        # PCM 16kHz 16bit mono = 32000 字节/秒
+        # 超时时间 = 音频时长 + 发送时间 + 处理时间（至少30秒缓冲），与最小超时取较大值
+        audio_duration_seconds = sent_bytes / 32000.0
+        send_time_seconds = audio_duration_seconds * 1.1  # 发送时间约为音频时长的1.1倍
+        buffer_seconds = 30.0  # 处理缓冲时间
+        return max(min_timeout, audio_duration_seconds + send_time_seconds + buffer_seconds)
+
+    xfyun_logger.info(f"开始连接讯飞实时转写，最小超时时间: {min_timeout:.2f}秒（随发送的音频时长延长）")
     
     try:
         # 在单独的线程中运行 WebSocket
@@ -706,11 +854,20 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
         ws_thread.start()
         
         # 等待事件，直到收到 finished/closed 或超时
-        # 注意：需要等待足够长的时间让服务器处理音频并返回结果
-        event_triggered = event.wait(timeout=timeout_seconds)
+        # 注意：需要等待足够长的时间让服务器处理音频并返回结果；
+        # 音频边转换边发送，超时期限随已发送的音频时长逐秒重新计算
+        wait_start = time.monotonic()
+        while True:
+            timeout_seconds = _timeout_seconds()
+            remaining = wait_start + timeout_seconds - time.monotonic()
+            if remaining <= 0:
+                event_triggered = False
+                break
+            if event.wait(timeout=min(remaining, 1.0)):
+                event_triggered = True
+                break
         
         if not event_triggered:
-            logger.warning(f"讯飞实时转写超时（{timeout_seconds:.2f}秒），可能音频文件过大或网络问题")
             xfyun_logger.warning(f"讯飞实时转写超时（{timeout_seconds:.2f}秒），可能音频文件过大或网络问题")
             warnings.append(f"讯飞实时转写超时（{timeout_seconds:.2f}秒），可能音频文件过大或网络问题")
             try:
@@ -718,7 +875,6 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
             except Exception:
                 pass
         else:
-            logger.info("讯飞实时转写事件已触发")
             xfyun_logger.info("讯飞实时转写事件已触发")
             # 即使事件已触发，也等待一小段时间确保收到所有消息
             time.sleep(0.5)
@@ -728,11 +884,8 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
         logger.error(error_msg, exc_info=True)
         warnings.append(error_msg)
     finally:
-        try:
-            os.remove(pcm_path)
-            logger.debug(f"已删除临时 PCM 文件: {pcm_path}")
-        except OSError as e:
-            logger.warning(f"删除临时 PCM 文件失败: {e}")
+        # 发送线程正常结束时已回收 ffmpeg；超时 / 异常时在这里结束进程
+        _close_pcm16_stream(pcm_proc, kill=True)
 
     # 收集所有有效的片段（长度>=3，排除最终的那个标点）
     valid_chunks = []
@@ -758,53 +911,36 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
     qwen_transcript = None
     
     if use_qwen_integration and valid_chunks and len(valid_chunks) > 1:
+        if on_preliminary is not None:
+            on_preliminary(max(valid_chunks, key=_content_length))
         qwen_transcript = _integrate_chunks_with_qwen(valid_chunks, logger)
     
     # 如果Qwen整合成功，使用整合结果；否则使用原始方法
     if qwen_transcript and len(qwen_transcript.strip()) > 0:
         transcript = qwen_transcript
-        logger.info(f"讯飞实时转写结果: 使用Qwen整合结果，长度: {len(transcript)} 字符")
         xfyun_logger.info(f"讯飞实时转写结果: 使用Qwen整合结果，长度: {len(transcript)} 字符")
     elif valid_chunks:
         # 使用原始方法：选择最长片段
         if len(valid_chunks) == 1:
             # 如果只有一个有效片段，直接使用
             transcript = valid_chunks[0]
-            logger.info(f"讯飞实时转写结果: 使用唯一有效片段，长度: {len(transcript)} 字符")
             xfyun_logger.info(f"讯飞实时转写结果: 使用唯一有效片段，长度: {len(transcript)} 字符")
         else:
             # 改进的去重策略：
             # 讯飞实时转写的特点：逐步识别，后面的片段通常包含前面片段的内容，但会更完整
             # 策略：从所有有效片段中选择最长的片段（包括最终结果）
             
-            # 查找最长的完整片段（按中文字符和字母数字计算）
-            best_chunk = valid_chunks[0]
-            best_length = len("".join(c for c in best_chunk if c.isalnum() or '\u4e00' <= c <= '\u9fff'))
-            
-            # 遍历所有片段，找到最长的
-            for chunk in valid_chunks:
-                chunk_length = len("".join(c for c in chunk if c.isalnum() or '\u4e00' <= c <= '\u9fff'))
-                if chunk_length > best_length:
-                    best_chunk = chunk
-                    best_length = chunk_length
-            
-            # 使用最长的片段
-            transcript = best_chunk
+            # 查找最长的完整片段（按中文字符和字母数字计算，并列时取靠前的片段）
+            transcript = max(valid_chunks, key=_content_length)
             
-            logger.info(f"讯飞实时转写结果: 从 {len(valid_chunks)} 个有效片段中选择最长片段，长度: {len(transcript)} 字符")
             xfyun_logger.info(f"讯飞实时转写结果: 从 {len(valid_chunks)} 个有效片段中选择最长片段，长度: {len(transcript)} 字符")
     else:
         transcript = ""
         logger.warning("讯飞实时转写未返回有效文本")
     
-    logger.info(f"讯飞实时转写识别到 {len(result_chunks)} 个文本片段，最终文本长度: {len(transcript)} 字符")
     xfyun_logger.info(f"讯飞实时转写识别到 {len(result_chunks)} 个文本片段，最终文本长度: {len(transcript)} 字符")
     xfyun_logger.info(f"最终转录文本: {transcript}")
     
-    # 移除文件日志处理器，避免日志文件持续增长
-    xfyun_logger.removeHandler(file_handler)
-    file_handler.close()
-    
     if error_occurred:
         logger.warning("讯飞实时转写过程中发生错误")
         if not transcript:
@@ -818,9 +954,13 @@ def _transcribe_audio_rtasr(audio_path: str, return_all_chunks: bool = False) ->
     return transcript, warnings
 
 
-def _transcribe_audio(audio_path: str) -> Tuple[str, List[str]]:
+def _transcribe_audio(
+    audio_path: str,
+    on_preliminary: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, List[str]]:
     """
     调用配置的语音转写服务。当前实现仅支持讯飞实时语音转写 (RTASR)。
+    on_preliminary 见 _transcribe_audio_rtasr。
     """
     provider_raw = os.getenv("INTERVIEW_ASR_PROVIDER", "rtasr")
     provider = provider_raw.lower().strip()
@@ -831,7 +971,7 @@ def _transcribe_audio(audio_path: str) -> Tuple[str, List[str]]:
     # 支持多种形式的rtasr配置：rtasr, rt, 空字符串
     if provider in ("", "rtasr", "rt") or provider.startswith("rtasr"):
         logger.info("使用讯飞实时语音转写 (RTASR)")
-        transcript, more_warnings = _transcribe_audio_rtasr(audio_path)
+        transcript, more_warnings = _transcribe_audio_rtasr(audio_path, on_preliminary=on_preliminary)
         warnings.extend(more_warnings)
         return transcript, warnings
 
@@ -843,6 +983,9 @@ def _transcribe_audio(audio_path: str) -> Tuple[str, List[str]]:
 
 _EVAL_CLIENT = None
 
+# 答案评估与 Qwen 片段整合是两次相互独立的模型调用，评估放到线程池中与整合并行
+_LLM_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="interview-llm")
+
 
 def _get_eval_client():
     global _EVAL_CLIENT
@@ -1042,8 +1185,7 @@ def create_session(job_description_text: Optional[str] = None) -> InterviewSessi
             "questionGenerationWarnings": warnings,
         },
     )
-    with _LOCK:
-        _SESSIONS[session.session_id] = session
+    _store_session(session)
     
     if warnings:
         logger.info(f"创建会话 {session.session_id} 时的警告: {', '.join(warnings)}")
@@ -1052,11 +1194,8 @@ def create_session(job_description_text: Optional[str] = None) -> InterviewSessi
 
 
 def get_session(session_id: str) -> InterviewSession:
-    with _LOCK:
-        session = _SESSIONS.get(session_id)
-        if not session:
-            raise KeyError("会话不存在或已过期")
-        return session
+    with _lock_for(session_id):
+        return _lookup_session(session_id)
 
 
 def submit_answer(
@@ -1065,10 +1204,8 @@ def submit_answer(
     audio_file: FileStorage,
     elapsed_seconds: Optional[float] = None,
 ) -> Tuple[AnswerRecord, Optional[str], Optional[str], List[str]]:
-    with _LOCK:
-        session = _SESSIONS.get(session_id)
-        if not session:
-            raise KeyError("会话不存在或已过期")
+    with _lock_for(session_id):
+        session = _lookup_session(session_id)
 
         if session.current_index >= len(session.questions):
             raise ValueError("所有面试题已作答完成")
@@ -1078,10 +1215,20 @@ def submit_answer(
             raise ValueError("题目顺序不正确，请按照给出的顺序回答。")
 
         start_ts = session.question_started_at or time.time()
-        audio_path = _save_audio_file(session_id, question_id, audio_file)
 
-    transcript, asr_warnings = _transcribe_audio(audio_path)
-    evaluation, eval_warnings = _evaluate_answer(expected_question.text, transcript)
+    audio_path = _save_audio_file(session_id, question_id, audio_file)
+
+    # 需要 Qwen 整合时，以最长片段为初步文本提前发起评估，省掉一次串行的模型往返
+    eval_futures: List[Future] = []
+
+    def _evaluate_early(preliminary: str) -> None:
+        eval_futures.append(_LLM_POOL.submit(_evaluate_answer, expected_question.text, preliminary))
+
+    transcript, asr_warnings = _transcribe_audio(audio_path, on_preliminary=_evaluate_early)
+    if eval_futures:
+        evaluation, eval_warnings = eval_futures[0].result()
+    else:
+        evaluation, eval_warnings = _evaluate_answer(expected_question.text, transcript)
     warnings = asr_warnings + eval_warnings
 
     duration = elapsed_seconds if elapsed_seconds is not None else time.time() - start_ts
@@ -1095,12 +1242,11 @@ def submit_answer(
         warnings=warnings,
     )
 
-    with _LOCK:
-        session = _SESSIONS[session_id]
+    with _lock_for(session_id):
         session.answers[expected_question.id] = record
         session.current_index += 1
         session.question_started_at = time.time() if session.current_index < len(session.questions) else None
-        _SESSIONS[session_id] = session
+        _store_session(session)
         next_question = (
             session.questions[session.current_index]
             if session.current_index < len(session.questions)
@@ -1,5 +1,53 @@
+# app/services/latex_utils.py
+"""
+Markdown -> LaTeX 转换与简历模板。
+
+纯函数模块：不依赖 Flask / 配置，路由与后台任务共用；
+热点函数带完整类型标注，便于按需用 mypyc 编译成扩展模块；不编译时按普通模块导入。
+"""
 import re
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# markdown_to_latex 用到的正则统一在模块级预编译，逐行调用时不再查 re 的内部缓存
+_RE_INLINE_CODE = re.compile(r'`([^`]+)`')
+_RE_LINK = re.compile(r'\[([^\]]+)\]\(([^\)]+)\)')
+_RE_BOLD_STAR = re.compile(r'\*\*([^\*]+)\*\*')
+_RE_BOLD_UNDER = re.compile(r'__([^_]+)__')
+_RE_ITALIC_STAR = re.compile(r'(?<!\*)\*([^\*]+)\*(?!\*)')
+_RE_ITALIC_UNDER = re.compile(r'(?<!_)_([^_]+)_(?!_)')
+_RE_OP_PLUS = re.compile(r'([^\s~\-])\s+\+\s+([^\s~\-])')
+_RE_OP_MINUS = re.compile(r'([^\s~\-])\s+-\s+([^\s~\-])')
+_RE_OP_EQ = re.compile(r'([^\s~])\s+=\s+([^\s~])')
+_RE_OP_LT = re.compile(r'([^\s~])\s+<\s+([^\s~])')
+_RE_OP_GT = re.compile(r'([^\s~])\s+>\s+([^\s~])')
+# (符号, 正则, 替换模板)，按原有顺序执行
+_OP_PASSES = (
+    ('+', _RE_OP_PLUS, r'\1~+~\2'),
+    ('-', _RE_OP_MINUS, r'\1~-~\2'),
+    ('=', _RE_OP_EQ, r'\1~=~\2'),
+    ('<', _RE_OP_LT, r'\1~<~\2'),
+    ('>', _RE_OP_GT, r'\1~>~\2'),
+)
+_RE_CODE_FENCE = re.compile(r'\s*```')
+_RE_LIST_ITEM = re.compile(r'^\s*([-*•])\s+')
+_RE_JOB = re.compile(r'^\s*\*\*([^\*]+)\*\*\s*\(([^\)]+)\)')
+# 行内格式占位符由两个 Unicode 私有区字符组成（编号字符 + 结束字符）：不会被转义，
+# 两个字符都满足运算符规则的 [^\s~\-]，与旧版多字符占位符在正则中的表现一致
+_SLOT_BASE = 0xE000
+_SLOT_END = '\uf8ff'
+_RE_SLOT_CHARS = re.compile('[\ue000-\uf8ff]')
+_RE_CONTACT_SEP = re.compile(r'\s*\|\s*')
+_CONTACT_JOIN = r' \ $|$ \ '
+# 可能开启结构化行（标题 / 列表 / 经历标题）的首字符
+_STRUCT_LEAD_CHARS = frozenset('#-*•')
+# markdown_to_latex 行类型（_classify_lines 预先算好，主循环按类型分派）
+_LK_TEXT, _LK_FENCE, _LK_H1, _LK_H2, _LK_H3, _LK_LIST, _LK_BLANK, _LK_JOB = range(8)
+# "# " / "## " / "### " 标题前缀，按 # 的个数查行类型
+_RE_HEADING = re.compile(r'(#{1,3}) ')
+_HEADING_KINDS = (None, _LK_H1, _LK_H2, _LK_H3)
+# 行内格式与运算符空白修复会用到的字符；一个都不含时 process_inline_formatting 直接转义返回
+_INLINE_META = frozenset('`*_[+-=<>')
 
 LATEX_SPECIAL = {
     '\\': r'\textbackslash{}',
@@ -14,140 +62,381 @@ LATEX_SPECIAL = {
     '~': r'\~{}',
 }
 
+# 单字符替换表：str.translate 一次扫描完成全部转义
+_LATEX_TRANS = str.maketrans(LATEX_SPECIAL)
+# 行内代码 \texttt{} 内只转义反斜杠与花括号，一次扫描完成。
+# 反斜杠的目标串与原先 replace 链（先换反斜杠、再换花括号）的输出逐字节一致
+_CODE_TRANS = str.maketrans({
+    '\\': r'\textbackslash\{\}',
+    '{': r'\{',
+    '}': r'\}',
+})
+
+
 def escape_latex(text: str) -> str:
     """转义普通段落中的 LaTeX 特殊字符"""
-    # 先替换反斜杠，避免后续二次替
-    text = text.replace('\\', LATEX_SPECIAL['\\'])
-    for ch, rep in LATEX_SPECIAL.items():
-        if ch == '\\':
-            continue
-        text = text.replace(ch, rep)
-    return text
+    return text.translate(_LATEX_TRANS)
+
+
+def process_inline_formatting(text: str) -> str:
+    """
+    处理行内格式：粗体、斜体、代码、链接，并修复符号前后空白。
+
+    各格式仍按 代码 > 链接 > 粗体 > 斜体 的优先级依次匹配（优先级决定了
+    snake_case 与 `code` 混排等情况的结果），但：
+    - 只有文本中出现对应标记字符时才执行该轮匹配，纯文本行不进正则；
+    - 渲染结果用单个私有区字符占位，最后与 LaTeX 转义合并为一次 str.translate 填回，
+      嵌套在粗体/斜体/链接文字中的片段也会被正确填回。
+    """
+    if _RE_SLOT_CHARS.search(text):
+        text = _RE_SLOT_CHARS.sub('', text)
+    # 不含任何行内标记 / 运算符字符的行（大部分正文）只需转义
+    if _INLINE_META.isdisjoint(text):
+        return text.translate(_LATEX_TRANS)
+
+    # 占位字符码位 -> 渲染结果；结束字符映射为 None（回填时删除）
+    fragments: Dict[int, Optional[str]] = {ord(_SLOT_END): None}
+
+    def slot(fragment: str) -> str:
+        key = _SLOT_BASE + len(fragments) - 1
+        fragments[key] = fragment
+        return chr(key) + _SLOT_END
+
+    def nested(inner: str) -> str:
+        # 片段内部：转义普通字符，并填回其中已渲染的占位符
+        return escape_latex(inner).translate(fragments)
+
+    # inline code
+    def repl_inline_code(m):
+        return slot(r'\texttt{' + m.group(1).translate(_CODE_TRANS) + '}')
+
+    # links
+    def repl_link(m):
+        link_url_escaped = m.group(2).translate(_LATEX_TRANS)
+        return slot(r'\href{' + link_url_escaped + '}{' + nested(m.group(1)) + '}')
+
+    # bold / italic
+    def repl_bold(m):
+        return slot(r'\textbf{' + nested(m.group(1)) + '}')
+
+    def repl_italic(m):
+        return slot(r'\textit{' + nested(m.group(1)) + '}')
+
+    if '`' in text:
+        text = _RE_INLINE_CODE.sub(repl_inline_code, text)
+    if '[' in text:
+        text = _RE_LINK.sub(repl_link, text)
+    has_star = '*' in text
+    has_under = '_' in text
+    if has_star:
+        text = _RE_BOLD_STAR.sub(repl_bold, text)
+    if has_under:
+        text = _RE_BOLD_UNDER.sub(repl_bold, text)
+    if has_star:
+        text = _RE_ITALIC_STAR.sub(repl_italic, text)
+    if has_under:
+        text = _RE_ITALIC_UNDER.sub(repl_italic, text)
+
+    # 修复符号前后的空白：各轮仍按固定顺序执行（前一轮插入的 ~ 会影响后一轮的匹配），
+    # 但只在文本含对应符号时才进正则；前面的轮次只插入 ~，不会引入新的运算符
+    for op, op_re, repl in _OP_PASSES:
+        if op in text:
+            text = op_re.sub(repl, text)
+
+    if len(fragments) == 1:
+        return escape_latex(text)
+    # 转义与占位符回填合并为一次扫描
+    return text.translate({**_LATEX_TRANS, **fragments})
+
 
 def markdown_to_latex(md: str) -> str:
     """
-    极简 Markdown -> LaTeX：
-    - #/##/### 标题 -> \section/\subsection/\subsubsection
-    - 列表行以 -, *, • 开头 -> itemize
+    改进的 Markdown -> LaTeX 转换：
+    - # 姓名 -> 大标题居中显示
+    - ## 章节 -> \section
+    - ### 子章节 -> \subsection
+    - 列表行以 -, *, • 开头 -> itemize (使用 enumitem 改进格式)
     - 行内 `code` -> \texttt{}
+    - **bold** -> \textbf{}
+    - *italic* -> \textit{}
+    - [text](url) -> \href{url}{text}
     - 三引号代码块 ``` -> verbatim
-    - 其他行做 LaTeX 特殊字符转义
+    - 防止长文本溢出
+
+    转换是纯函数：不超过 _LATEX_CACHE_MAX_CHARS 的输入走 LRU 缓存，
+    同一份 Markdown 重试生成 PDF 时直接复用结果。
+    """
+    if len(md) <= _LATEX_CACHE_MAX_CHARS:
+        return _markdown_to_latex_cached(md)
+    return _convert_markdown_to_latex(md)
+
+
+def _classify_lines(lines: List[str]) -> Tuple[List[int], List[bool]]:
     """
+    一次扫描给每行分类，返回 (kinds, closes_minipage)：
+    - kinds[i]：_LK_* 行类型，主循环直接按类型分派，不再逐行重复匹配；
+    - closes_minipage[i]：列表在该行之前结束时是否需要关闭 minipage
+      （该行去空白后为空、以 # 开头或以 ** 开头）。
+    """
+    kinds: List[int] = []
+    closes: List[bool] = []
+    for line in lines:
+        first = line[:1]
+        if '```' in line and _RE_CODE_FENCE.match(line):
+            kind = _LK_FENCE
+        elif first and first not in _STRUCT_LEAD_CHARS and not first.isspace():
+            kind = _LK_TEXT
+        elif first == '#' and (heading := _RE_HEADING.match(line)):
+            kind = _HEADING_KINDS[len(heading.group(1))]
+        elif _RE_LIST_ITEM.match(line):
+            kind = _LK_LIST
+        elif not line.strip():
+            kind = _LK_BLANK
+        elif _RE_JOB.match(line):
+            kind = _LK_JOB
+        else:
+            kind = _LK_TEXT
+        kinds.append(kind)
+        stripped = line.strip()
+        closes.append(not stripped or stripped.startswith(('#', '**')))
+    return kinds, closes
+
+
+def _convert_markdown_to_latex(md: str) -> str:
     lines = md.splitlines()
-    out = []
+    kinds, closes_minipage = _classify_lines(lines)
+    n = len(lines)
+    out: List[str] = []
+    emit = out.append  # 逐行输出最多的操作，绑定为局部名
     in_verbatim = False
     in_itemize = False
+    in_minipage = False  # 跟踪是否在minipage环境中
+    is_first_line = True  # 标记第一行（姓名）
 
-    def flush_itemize():
-        nonlocal in_itemize
+    def flush_itemize(check_next=True):
+        nonlocal in_itemize, in_minipage
         if in_itemize:
-            out.append(r'\end{itemize}')
+            emit(r'\end{itemize}')
             in_itemize = False
+            # 如果列表结束且下一行不是列表项，关闭minipage
+            if in_minipage and check_next and i < n and closes_minipage[i]:
+                emit(r'\end{minipage}')
+                in_minipage = False
 
     i = 0
-    while i < len(lines):
+    while i < n:
         line = lines[i]
+        kind = kinds[i]
 
-        # 代码块开始/结束：```lang 或 ```
-        if re.match(r'\s*```', line):
+        # ``` 代码块
+        if kind == _LK_FENCE:
             flush_itemize()
             if not in_verbatim:
-                out.append(r'\begin{verbatim}')
+                emit(r'\begin{verbatim}')
                 in_verbatim = True
             else:
-                out.append(r'\end{verbatim}')
+                emit(r'\end{verbatim}')
                 in_verbatim = False
             i += 1
             continue
 
         if in_verbatim:
-            out.append(line)  # verbatim 里不做转义
+            emit(line)
             i += 1
             continue
 
-        # 标题
-        if line.startswith('### '):
-            flush_itemize()
-            out.append(r'\subsubsection{' + escape_latex(line[4:].strip()) + '}')
-            i += 1
-            continue
-        if line.startswith('## '):
-            flush_itemize()
-            out.append(r'\subsection{' + escape_latex(line[3:].strip()) + '}')
-            i += 1
-            continue
-        if line.startswith('# '):
+        # 普通段落（简历正文大多走这里）
+        if kind == _LK_TEXT:
             flush_itemize()
-            out.append(r'\section{' + escape_latex(line[2:].strip()) + '}')
+            emit(process_inline_formatting(line))
             i += 1
             continue
 
         # 列表项
-        if re.match(r'^\s*([-*•])\s+', line):
+        if kind == _LK_LIST:
             if not in_itemize:
-                out.append(r'\begin{itemize}')
+                # 以 \end{tabularx} 结尾的输出行只会是本函数写入的整行字面量，直接比较即可
+                if out and out[-1] == r'\end{tabularx}':
+                    emit(r'\begin{minipage}[t]{\linewidth}')
+                    in_minipage = True
+                emit(r'\begin{itemize}[nosep,after=\strut, leftmargin=1em, itemsep=3pt,label=--]')
                 in_itemize = True
-            item_text = re.sub(r'^\s*([-*•])\s+', '', line)
-            out.append(r'\item ' + escape_latex(item_text))
+            item_text = line[_RE_LIST_ITEM.match(line).end():]
+            emit(r'\item ' + process_inline_formatting(item_text))
             i += 1
             continue
-        else:
-            flush_itemize()
 
-        # 行内代码 `code`
-        def repl_inline_code(m):
-            inner = m.group(1)
-            # 在 \texttt{} 里只做最小替换，避免大范围转义破坏等宽体
-            inner = inner.replace('\\', r'\textbackslash{}')
-            inner = inner.replace('{', r'\{').replace('}', r'\}')
-            return r'\texttt{' + inner + '}'
+        flush_itemize()
 
-        line = re.sub(r'`([^`]+)`', repl_inline_code, line)
+        # 空行
+        if kind == _LK_BLANK:
+            emit('')
+            i += 1
+            continue
 
-        # 普通段落转义
-        if line.strip():
-            out.append(escape_latex(line))
-        else:
-            out.append('')  # 空行保留段落
+        # 标题处理
+        if kind == _LK_H3:
+            title_text = process_inline_formatting(line[4:].strip())
+            emit(r'\subsubsection{' + title_text + '}')
+            i += 1
+            continue
+        if kind == _LK_H2:
+            title_text = process_inline_formatting(line[3:].strip())
+            emit(r'\section{' + title_text + '}')
+            i += 1
+            continue
+        if kind == _LK_H1:
+            title_text = process_inline_formatting(line[2:].strip())
+            if is_first_line:
+                emit(r'\begin{tabularx}{\linewidth}{@{} C @{}}')
+                emit(r'\Huge{' + title_text + r'} \\[7.5pt]')
+                is_first_line = False
+                i += 1
+                # 下一行如果是联系方式（非空行判断直接用预先算好的行类型）
+                if i < n and kinds[i] != _LK_BLANK and not lines[i].startswith('#'):
+                    contact_parts = _RE_CONTACT_SEP.split(lines[i].strip())
+                    emit(_CONTACT_JOIN.join(process_inline_formatting(p) for p in contact_parts) + r' \\')
+                    i += 1
+                emit(r'\end{tabularx}')
+            else:
+                emit(r'\section{' + title_text + '}')
+                i += 1
+            continue
 
+        # 工作经历/项目标题（_LK_JOB）
+        job_match = _RE_JOB.match(line)
+        job_title = job_match.group(1).strip()
+        job_time = job_match.group(2).strip()
+        emit(r'\begin{tabularx}{\linewidth}{@{}l X r@{}}')
+        emit(
+            r'\textbf{' + escape_latex(job_title) + r'} & \hfill & ' + escape_latex(job_time) + r' \\[3.75pt]')
+        emit(r'\end{tabularx}')
         i += 1
 
-    flush_itemize()
+    flush_itemize(check_next=False)
+    if in_minipage:
+        emit(r'\end{minipage}')
     return '\n'.join(out)
 
 
-def wrap_into_template(body: str, chinese: bool = True) -> str:
-    """
-    把正文塞进一个安全的 LaTeX 模板里：
-    - chinese=True 时：用 fontspec + 系统中文字体（macOS：PingFang SC）
-    - 不依赖 minted 等需要 shell-escape 的包
-    """
-    if chinese:
-        return r"""
-\documentclass[11pt]{article}
+# 只缓存 64KB 以内的 Markdown，避免超长输入占住缓存内存
+_LATEX_CACHE_MAX_CHARS = 64 * 1024
+_markdown_to_latex_cached = lru_cache(maxsize=128)(_convert_markdown_to_latex)
+
+
+# 模板前言按中/英文各拼接一次，wrap_into_template 只做查表
+_PREAMBLE_HEAD = r"""
+\documentclass[a4paper,12pt]{article}
+\usepackage{url}
+\usepackage{parskip}
+\RequirePackage{color}
+\RequirePackage{graphicx}
+\usepackage[usenames,dvipsnames]{xcolor}
+\usepackage[scale=0.9]{geometry}
+\usepackage{tabularx}
+\usepackage{enumitem}
+\usepackage{supertabular}
+\usepackage{titlesec}
+\usepackage{multicol}
+\usepackage{multirow}
+"""
+
+_PREAMBLE_FONTS_ZH = r"""
 \usepackage{fontspec}
-\setmainfont{Times New Roman}
-\newfontfamily\cnfont{PingFang SC}  % macOS 常见中文字体
-\usepackage{geometry}
-\geometry{a4paper,margin=1in}
-\usepackage[colorlinks=true,linkcolor=blue,urlcolor=blue]{hyperref}
-\setlength{\parskip}{6pt}
-\begin{document}
-{\cnfont
-""" + body + r"""
-}
-\end{document}
+% 设置中文字体为默认字体
+\setmainfont{PingFang SC}[Ligatures=TeX]
+\newfontfamily\cnfont{PingFang SC}
 """
-    else:
-        return r"""
-\documentclass[11pt]{article}
+
+_PREAMBLE_FONTS_EN = r"""
 \usepackage[T1]{fontenc}
 \usepackage{lmodern}
-\usepackage{geometry}
-\geometry{a4paper,margin=1in}
-\usepackage[colorlinks=true,linkcolor=blue,urlcolor=blue]{hyperref}
+"""
+
+_PREAMBLE_SECTION_ZH = r"""
+% 自定义章节格式
+
+\titleformat{\section}{\Large\bfseries\raggedright}{}{0em}{}[\titlerule]
+\titlespacing{\section}{0pt}{10pt}{10pt}
+"""
+
+_PREAMBLE_SECTION_EN = r"""
+% 自定义章节格式
+
+\titleformat{\section}{\Large\scshape\raggedright}{}{0em}{}[\titlerule]
+\titlespacing{\section}{0pt}{10pt}{10pt}
+"""
+
+_PREAMBLE_TAIL = r"""
+% 超链接设置
+\usepackage[unicode, draft=false]{hyperref}
+\definecolor{linkcolour}{rgb}{0,0.2,0.6}
+\hypersetup{colorlinks,breaklinks,urlcolor=linkcolour,linkcolor=linkcolour}
+
+% 防止溢出
+\newcolumntype{C}{>{\centering\arraybackslash}X}
+\newlength{\fullcollw}
+\setlength{\fullcollw}{0.47\textwidth}
+
+% 工作经历环境定义
+\newenvironment{jobshort}[2]
+    {
+    \begin{tabularx}{\linewidth}{@{}l X r@{}}
+    \textbf{#1} & \hfill &  #2 \\[3.75pt]
+    \end{tabularx}
+    }
+    {
+    }
+
+\newenvironment{joblong}[2]
+    {
+    \begin{tabularx}{\linewidth}{@{}l X r@{}}
+    \textbf{#1} & \hfill &  #2 \\[3.75pt]
+    \end{tabularx}
+    \begin{minipage}[t]{\linewidth}
+    \begin{itemize}[nosep,after=\strut, leftmargin=1em, itemsep=3pt,label=--]
+    }
+    {
+    \end{itemize}
+    \end{minipage}    
+    }
+
+% 页面设置
+\pagestyle{empty}
 \setlength{\parskip}{6pt}
+\setlength{\parindent}{0pt}
+\raggedright
+\sloppy
+\emergencystretch=3em
+\tolerance=1000
+\hbadness=10000
+
+\setlength{\lineskip}{0pt}
+\setlength{\baselineskip}{1.1\baselineskip}
+
+\binoppenalty=10000
+\relpenalty=10000
+
 \begin{document}
-""" + body + r"""
+"""
+
+_PREAMBLE_ZH = _PREAMBLE_HEAD + _PREAMBLE_FONTS_ZH + _PREAMBLE_SECTION_ZH + _PREAMBLE_TAIL
+_PREAMBLE_EN = _PREAMBLE_HEAD + _PREAMBLE_FONTS_EN + _PREAMBLE_SECTION_EN + _PREAMBLE_TAIL
+_DOCUMENT_END = r"""
 \end{document}
-"""
\ No newline at end of file
+"""
+
+
+# 中文正文包裹在 {\cnfont ...} 分组内
+_CNFONT_OPEN = "{\\cnfont\n"
+_CNFONT_CLOSE = "\n}"
+
+
+def wrap_into_template(body: str, chinese: bool = True) -> str:
+    """
+    使用改进的 LaTeX 模板，参考专业简历格式，防止内容溢出
+    """
+    # 一次 join 拼出整篇文档，不再为正文包裹单独生成中间字符串
+    if chinese:
+        return "".join((_PREAMBLE_ZH, _CNFONT_OPEN, body, _CNFONT_CLOSE, _DOCUMENT_END))
+    return "".join((_PREAMBLE_EN, body, _DOCUMENT_END))
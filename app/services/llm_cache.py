@@ -0,0 +1,88 @@
+# app/services/llm_cache.py
+"""
+大模型调用结果缓存：以 (模型, 温度, messages) 的哈希为键，命中时直接返回上次的输出，
+跳过耗时数十秒的 chat.completions 调用（用户常用同样的输入重试生成）。
+
+缓存只存在于当前进程内（LRU + TTL）；多 worker 部署时各 worker 各自缓存。
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 缓存条目的默认有效期（秒）与最大条目数
+_DEFAULT_TTL = int(os.environ.get("LLM_CACHE_TTL", "86400"))
+_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_SIZE", "256"))
+
+# key -> (过期时刻, 模型输出)
+_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def cache_key(messages: List[Dict[str, str]], model: str, temperature: float) -> str:
+    """对完整请求参数做规范化 JSON 序列化后取 blake2b 摘要"""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    """取缓存；不存在或已过期返回 None"""
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _CACHE[key]
+            return None
+        _CACHE.move_to_end(key)
+        return entry[1]
+
+
+def put(key: str, content: str, ttl: Optional[int] = None) -> None:
+    """写入缓存，超出容量时淘汰最久未使用的条目"""
+    expires_at = time.monotonic() + (_DEFAULT_TTL if ttl is None else ttl)
+    with _LOCK:
+        _CACHE[key] = (expires_at, content)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+
+
+def get_or_generate(
+    client_factory: Callable[[], Any],
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    ttl: Optional[int] = None,
+    force: bool = False,
+) -> str:
+    """
+    非流式 chat.completions 调用的缓存封装，返回模型输出文本。
+    client_factory 只在未命中时调用；force=True 时忽略已有缓存（结果仍会写回）。
+    空输出不缓存，以便重试时重新调用模型。
+    """
+    key = cache_key(messages, model, temperature)
+    if not force:
+        cached = get(key)
+        if cached is not None:
+            logger.info(f"命中大模型输出缓存，跳过 API 调用（model: {model}）")
+            return cached
+
+    completion = client_factory().chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+    )
+    content = completion.choices[0].message.content or ""
+    if content:
+        put(key, content, ttl)
+    return content
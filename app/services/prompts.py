@@ -1,10 +1,7 @@
-def build_resume_prompt(resume_text: str, jd_text: str, language: str = 'zh') -> str:
-    """
-    根据语言生成对应的prompt
-    language: 'zh' 或 'en'
-    """
-    if language == 'zh':
-        return f"""# 角色
+# 简历生成 prompt 分两段：与输入无关的任务说明（按语言预先写好）在前，
+# 简历 / JD 原文在后。同语言请求共享完全相同的前缀，便于模型服务端的前缀缓存命中。
+_RESUME_PROMPT_STATIC = {
+    'zh': """# 角色
 
 你是一位资深的简历优化专家和AI招聘助手。
 
@@ -59,21 +56,8 @@ def build_resume_prompt(resume_text: str, jd_text: str, language: str = 'zh') ->
 【个人信息库】:
 
 ---
-{resume_text}
----
-
-【岗位JD】:
-
----
-{jd_text}
----
-
-# 输出
-
-请直接生成最终的简历内容（Markdown格式）。
-"""
-    else:
-        return f"""# Role
+""",
+    'en': """# Role
 
 You are a senior resume optimization expert and AI recruitment assistant.
 
@@ -128,7 +112,24 @@ Your task is to filter, extract, integrate, and optimize information from the 
 【Personal Information Database】:
 
 ---
-{resume_text}
+""",
+}
+
+_RESUME_PROMPT_DYNAMIC = {
+    'zh': """{resume_text}
+---
+
+【岗位JD】:
+
+---
+{jd_text}
+---
+
+# 输出
+
+请直接生成最终的简历内容（Markdown格式）。
+""",
+    'en': """{resume_text}
 ---
 
 【Job Description】:
@@ -140,7 +141,27 @@ Your task is to filter, extract, integrate, and optimize information from the 
 # Output
 
 Please directly generate the final resume content (Markdown format).
-"""
+""",
+}
+
+
+def build_resume_prompt_static(language: str = 'zh') -> str:
+    """prompt 的固定部分：角色、任务、生成要求（每种语言只有一份）"""
+    return _RESUME_PROMPT_STATIC['zh' if language == 'zh' else 'en']
+
+
+def build_resume_prompt_dynamic(resume_text: str, jd_text: str, language: str = 'zh') -> str:
+    """prompt 的可变部分：个人信息库与岗位JD原文，接在固定部分之后"""
+    template = _RESUME_PROMPT_DYNAMIC['zh' if language == 'zh' else 'en']
+    return template.format(resume_text=resume_text, jd_text=jd_text)
+
+
+def build_resume_prompt(resume_text: str, jd_text: str, language: str = 'zh') -> str:
+    """
+    根据语言生成对应的prompt
+    language: 'zh' 或 'en'
+    """
+    return build_resume_prompt_static(language) + build_resume_prompt_dynamic(resume_text, jd_text, language)
 
 def build_resume_verification_prompt(resume_text: str, generated_resume: str, language: str = 'zh') -> str:
     """
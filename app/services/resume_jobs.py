@@ -0,0 +1,89 @@
+# app/services/resume_jobs.py
+"""
+简历生成后台任务：进程内线程池 + 任务表。
+
+生成接口带 ?async=1 时只负责解析请求、提交任务并立即返回 jobId，
+模型调用与 LaTeX 编译在这里的线程池中执行，前端轮询状态接口取结果。
+任务表只存在于当前进程内（多 worker 部署时需粘性会话或改用外部队列）。
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 同时执行的生成任务数（每个任务会占用一次模型调用 + 一次 LaTeX 编译）
+_MAX_WORKERS = int(os.environ.get("RESUME_JOB_WORKERS", "2"))
+# 已结束任务在任务表中保留的秒数，过期后在下次提交时清理
+_JOB_TTL_SECONDS = int(os.environ.get("RESUME_JOB_TTL", "3600"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="resume-job")
+_JOBS: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+
+
+def _prune_expired(now: float) -> None:
+    """清理已结束且超过 TTL 的任务（调用方需持有 _LOCK）"""
+    expired = [
+        job_id for job_id, job in _JOBS.items()
+        if job["finished_at"] is not None and now - job["finished_at"] > _JOB_TTL_SECONDS
+    ]
+    for job_id in expired:
+        del _JOBS[job_id]
+
+
+def _update(job_id: str, **fields: Any) -> None:
+    with _LOCK:
+        job = _JOBS.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+
+def _run(job_id: str, fn: Callable[..., Dict[str, Any]], args: tuple, label: str, warn_on_failure: bool) -> None:
+    _update(job_id, status="running")
+    try:
+        result = fn(*args)
+    except Exception as exc:
+        if warn_on_failure:
+            # 预期内可能失败的附属任务（如后台 PDF 编译）：与同步流程一致只记 warning，不打堆栈
+            logger.warning(f"{label}失败（不影响主流程），job_id: {job_id}: {exc}")
+        else:
+            logger.exception(f"{label}失败，job_id: {job_id}")
+        _update(job_id, status="failed", error=str(exc), finished_at=time.time())
+    else:
+        _update(job_id, status="done", result=result, finished_at=time.time())
+
+
+def submit_job(
+    job_id: str,
+    fn: Callable[..., Dict[str, Any]],
+    *args: Any,
+    label: str = "简历生成任务",
+    warn_on_failure: bool = False,
+) -> str:
+    """
+    登记任务并提交到线程池，返回 job_id。
+    label 用于失败日志；warn_on_failure 为真时失败只记 warning（不带堆栈）。
+    """
+    now = time.time()
+    with _LOCK:
+        _prune_expired(now)
+        _JOBS[job_id] = {
+            "status": "pending",
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "finished_at": None,
+        }
+    _EXECUTOR.submit(_run, job_id, fn, args, label, warn_on_failure)
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """返回任务状态快照（副本）；不存在或已过期返回 None"""
+    with _LOCK:
+        job = _JOBS.get(job_id)
+        return dict(job) if job is not None else None